@@ -24,11 +24,228 @@ SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # general modules used
 from numpy import *                 # matrix manipulation
 from numpy.random import *          # matrix manipulation
+from numpy.random import RandomState    # seedable random numbers
 from string import *                # string management
 from random import *                # random number generator
+import os                           # graph directories
+import gzip                         # compressed graph files
 # personal modules
 from search_order import *          # searching algorithms
 
+_READ_CHUNK = 1 << 22               # bytes of text read at once
+_WRITE_CHUNK = 1 << 16              # numbers formatted at once
+
+"""
+text files
+"""
+def _open_text(file_name, mode='r'):
+    """
+    open a text file, compressed with gzip if its name ends in .gz
+    
+    @type file_name: string
+    @param file_name: name of the file
+    
+    @type mode: string
+    @param mode: 'r' to read or 'w' to write
+    
+    @rtype: file
+    @return: open file
+    """
+    if file_name.endswith('.gz'):
+        return gzip.open(file_name, mode + 'b', 1)    # fast compression
+    else:
+        return open(file_name, mode)
+
+def _write_vector(text_file, values):
+    """
+    write the vector values in one line as [v1, v2, ...], formatting it
+    by chunks (reals are written with all their digits)
+    
+    @type text_file: file
+    @param text_file: open file
+    
+    @type values: vector
+    @param values: values to write
+    """
+    values = ravel(values)
+    text_file.write('[')
+    for start in range(0, size(values), _WRITE_CHUNK):
+        if start > 0:
+            text_file.write(', ')
+        chunk = values[start:start + _WRITE_CHUNK].tolist()
+        text_file.write(str(chunk)[1:-1])
+    text_file.write(']\n')
+
+"""
+array storage
+"""
+def _graph_array(name, positions=False):
+    """
+    property for a graph array kept in a growable buffer: reading it gives
+    the rows in use of the buffer, assigning it replaces the buffer
+    
+    @type name: string
+    @param name: name of the array
+    
+    @type positions: boolean
+    @param positions: true if the array is indexed by or holds arc positions
+                      (deleted arcs are compacted before it is used)
+    
+    @rtype: property
+    @return: property giving access to the array
+    """
+    def get(self):
+        if positions and self._dead:
+            self.compact()
+        return self._view[name]
+    
+    def set(self, value):
+        if positions and self._dead:
+            self.compact()
+        self._store(name, value)
+        if name in ('A', 'N'):
+            self._arc_index_ok = False
+            self._sorted = False
+            self._reverse_ok = False
+        self.touch(name)
+    
+    return property(get, set)
+
+"""
+arc lists
+"""
+def _star_links(nodes, n, end):
+    """
+    link the arcs of each node in ascending position, as in the forward
+    star (grouping by tail) or the reverse star (grouping by head)
+    
+    @type nodes: int vector
+    @param nodes: node of each arc used to group them
+    
+    @type n: number
+    @param n: number of nodes
+    
+    @type end: number
+    @param end: link of the last arc of each node
+    
+    @rtype: tuple
+    @return: (first & last arc of each node, link to the next arc of each arc)
+    """
+    # initialize without arcs
+    first_last = -1 * ones((n, 2), int)
+    link = end * ones(size(nodes), int)
+    if size(nodes) == 0:
+        return first_last, link
+    
+    # group the arcs by node, keeping the positions in ascending order
+    order = argsort(nodes, kind='mergesort')
+    nodes = nodes[order]
+    
+    # link consecutive arcs of the same node
+    same = nodes[1:] == nodes[:-1]
+    link[order[:-1][same]] = order[1:][same]
+    
+    # first and last arc of each node
+    first = append(True, logical_not(same))
+    last = append(logical_not(same), True)
+    first_last[nodes[first] - 1, 0] = order[first]
+    first_last[nodes[last] - 1, 1] = order[last]
+    
+    return first_last, link
+
+def _append_links(first_last, link, nodes, m, end):
+    """
+    link new arcs, in positions m, m+1, ..., at the end of the arcs of
+    their nodes (in place)
+    
+    @type first_last: int matrix
+    @param first_last: first & last arc of each node
+    
+    @type link: int vector
+    @param link: link to the next arc of each arc, including the new ones
+    
+    @type nodes: int vector
+    @param nodes: node of each new arc (tail or head)
+    
+    @type m: number
+    @param m: position of the first new arc
+    
+    @type end: number
+    @param end: link of the last arc of each node
+    """
+    # link the new arcs among them
+    new, new_link = _star_links(nodes, shape(first_last)[0], end)
+    link[m:] = where(new_link == end, end, new_link + m)
+    
+    # nodes with new arcs, split in those that had arcs and those that not
+    has = flatnonzero(new[:,0] != -1)
+    had = has[first_last[has,1] != -1]
+    fresh = has[first_last[has,1] == -1]
+    
+    # put the new arcs after the last old arc of each node
+    link[first_last[had,1]] = new[had,0] + m
+    first_last[fresh,0] = new[fresh,0] + m
+    first_last[has,1] = new[has,1] + m
+
+"""
+random sampling
+"""
+def _unique_sample(M, k, rs):
+    """
+    sample k different integers from 0 to M - 1, in random order
+    
+    @type M: number
+    @param M: number of integers to choose from
+    
+    @type k: number
+    @param k: number of integers to sample (k <= M)
+    
+    @type rs: RandomState
+    @param rs: random number generator
+    
+    @rtype: int vector
+    @return: sampled integers
+    """
+    # if most of them are needed, shuffle all of them
+    if 2 * k > M:
+        return rs.permutation(M)[:k]
+    
+    # otherwise draw with replacement until there are enough different ones
+    codes = empty(0, int)
+    while size(codes) < k:
+        codes = append(codes, rs.randint(0, M, 2 * (k - size(codes)) + 16))
+        # keep the first draw of each integer
+        first = unique(codes, return_index=True)[1]
+        codes = codes[sort(first)]
+    
+    return codes[:k]
+
+def _orient(i, j, directed, rs):
+    """
+    orientation of the edges (i, j): random for directed graphs, and
+    from the smallest to the largest node for undirected graphs
+    
+    @type i, j: int vectors
+    @param i, j: end nodes of each edge
+    
+    @type directed: boolean
+    @param directed: true for directed graphs
+    
+    @type rs: RandomState
+    @param rs: random number generator
+    
+    @rtype: tuple
+    @return: (tails, heads)
+    """
+    low, high = minimum(i, j), maximum(i, j)
+    if not directed:
+        return low, high
+    
+    # swap half of them at random
+    swap = rs.randint(0, 2, size(i)) == 1
+    
+    return where(swap, high, low), where(swap, low, high)
+
 """
 graph class
 """
@@ -52,14 +269,78 @@ class Graph(object):
     source       : source node
     sink         : sink node
     mirror[arc]  : used for residual graphs, link to the mirror arc
+    
+    N_in[j-1,:]  : start & end positions in A[] of the in-arcs of node j
+    in_link[arc] : next in-arc with the same head as arc (-1 if it is the last)
+    
+    all the arrays above are kept in buffers with spare rows, so adding
+    nodes and arcs one by one takes amortized constant time
+    
+    deleted arcs are only unlinked and marked (tail 0) in the buffers, and
+    are removed all together by compact() before any of the arc arrays is
+    used again, or when they are more than compact_ratio of the buffer
+    
+    view() gives a read-only graph sharing the buffers: the view and the
+    graph copy an array before changing it, so a graph can be solved over
+    without copying it or changing it; while an array is shared it cannot
+    be changed in place, get_writable() gives it ready to be changed
+    
+    set_arc_index() keeps a dictionary from (i, j) to the position of the
+    arc, so get_arc_pos(), has_arc() and get_arcs_pos() take constant time
+    
+    sort_arcs() sorts the arcs by tail and head, the graph keeps track of
+    it while arcs are only added in order or deleted, so sorting it again
+    takes no time
+    
+    the graph counts its changes (get_version()) and keeps the data derived
+    from its arcs and costs (degrees, reachable nodes, topological order,
+    connectivity, sign of the costs) until they change, so solving again
+    over the same graph does not check them again
+    
+    set_compact() keeps the indices as int32 and the data as float32 or
+    float64, memory_usage() gives the bytes used by each array
     """
+    __slots__ = ['type', 'names', 'source', 'sink', 'compact_ratio',
+                 '_buffer', '_view', '_owned', '_dtype', '_dead',
+                 '_arc_index', '_arc_index_ok', '_adjacency', '_sorted',
+                 '_version', '_memo', '_live', '_reverse_ok']
+    
+    # arrays kept in growable buffers
+    N = _graph_array('N', True)
+    A = _graph_array('A', True)
+    B = _graph_array('B')
+    c = _graph_array('c', True)
+    u = _graph_array('u', True)
+    f = _graph_array('f', True)
+    coord = _graph_array('coord')
+    mirror = _graph_array('mirror', True)
+    N_in = _graph_array('N_in', True)
+    in_link = _graph_array('in_link', True)
     
-    def __init__(self):
+    def __init__(self, data_types=None):
         """
         graph initialization
+        
+        @type data_types: dictionary
+        @param data_types: type of each array in compact mode (the graph
+                           is cleaned with its own, to stay in compact mode)
         """
         self.type = 'x'             # set as none
         
+        self._buffer = {}           # backing buffer of each array
+        self._view = {}             # rows in use of each buffer
+        self._owned = {}            # true if the buffer was allocated here
+        self._dtype = dict(data_types or {})    # types in compact mode
+        self._dead = 0              # deleted arcs waiting to be compacted
+        self._live = None           # tree counting the arcs not deleted
+        self.compact_ratio = 0.25   # fraction of deleted arcs that compacts
+        self._arc_index = None      # (i, j) -> arc position, if it is used
+        self._arc_index_ok = False  # true if the index matches the arcs
+        self._adjacency = None      # neighbor lists, built when needed
+        self._sorted = True         # true if arcs are sorted by tail & head
+        self._version = 0           # number of changes made to the graph
+        self._memo = {}             # derived data, by the array it uses
+        
         self.N = empty((0,2), int)  # initial and end points of node data
         self.A = empty((0,3), int)  # adjacency matrix
         self.B = empty(0)           # external flow for each node
@@ -75,6 +356,10 @@ class Graph(object):
         self.sink = []              # sink node(s)
         self.mirror = empty(0, int) # mirror of arc, used for residual graphs
         
+        self.N_in = empty((0,2), int)   # initial and end points of in-arcs
+        self.in_link = empty(0, int)    # links between in-arcs (reverse star)
+        self._reverse_ok = True         # true if N_in matches A and N
+        
     def __str__(self):
         """
         str for Graph() object
@@ -140,12 +425,103 @@ class Graph(object):
             
         return m
     
+    """
+    Array Storage
+    """
+    def _store(self, name, value, owned=False):
+        """
+        set the array name, using value as its buffer
+        
+        @type name: string
+        @param name: name of the array
+        
+        @type value: array
+        @param value: new value of the array
+        
+        @type owned: boolean
+        @param owned: true if value was allocated for the graph (otherwise
+                      it is copied before being changed in place)
+        """
+        value = asarray(value, self._dtype.get(name))
+        self._buffer[name] = value
+        self._view[name] = value
+        self._owned[name] = owned
+        if name == 'A':
+            self._live = None
+    
+    def _own(self, name):
+        """
+        copy the array name if its buffer is not owned by the graph, so it
+        can be changed in place
+        
+        @type name: string
+        @param name: name of the array
+        """
+        if not self._owned[name]:
+            self._store(name, self._view[name].copy(), True)
+    
+    def _push(self, name, rows):
+        """
+        append rows at the end of the array name, doubling the size of its
+        buffer when it is full
+        
+        @type name: string
+        @param name: name of the array
+        
+        @type rows: array
+        @param rows: rows to append (one per element for vectors)
+        """
+        buffer = self._buffer[name]
+        rows = asarray(rows)
+        length = shape(self._view[name])[0]     # rows in use
+        need = length + shape(rows)[0]          # rows needed
+        
+        # get a new buffer if it is full or not owned by the graph
+        if need > shape(buffer)[0] or not self._owned[name]:
+            capacity = max(need, 2 * length, 4)
+            new = empty((capacity,) + shape(buffer)[1:], buffer.dtype)
+            new[:length] = buffer[:length]
+            buffer = new
+            self._buffer[name] = buffer
+            self._owned[name] = True
+        
+        # put the rows in the buffer and update the view
+        buffer[length:need] = rows
+        self._view[name] = buffer[:need]
+        if name == 'A':
+            self._live = None
+    
+    def get_writable(self, name):
+        """
+        get the array name to change it in place, copying it first if its
+        buffer is shared (with a view, or with the graph of a view), and
+        forgetting the data derived from it (as touch() does)
+        
+        @type name: string
+        @param name: name of the array
+        
+        @rtype: array
+        @return: the array, that can be changed in place
+        """
+        getattr(self, name)         # deleted arcs are compacted first
+        self._own(name)
+        if name in ('A', 'N'):
+            self._arc_index_ok = False
+            self._sorted = False
+            self._reverse_ok = False
+            self._live = None
+        self.touch(name)
+        
+        return self._view[name]
+    
     """
     Forming Functions
     """
-    def random_graph(self, g_size, g_type):
+    def random_graph(self, g_size, g_type, seed=None):
         """
-        build a random graph (without costs, capacities, etc.)
+        build a random graph (without costs, capacities, etc.), choosing
+        m different pairs of nodes with a random orientation (no loops,
+        and no arc has its reverse arc in the graph)
         
         @type g_size: vector with 2 numbers 
         @param g_size: size of the graph [n = nodes, m = edges]
@@ -153,14 +529,24 @@ class Graph(object):
         @type g_type: list []
         @param g_type: type of graph - "directed", "undirected"
         
+        @type seed: number
+        @param seed: seed of the random numbers (optional)
+        
         @rtype: graph
         @return: random generated graph
         """
-        self.__init__()             # clean the graph
+        self.__init__(self._dtype)  # clean the graph
+        rs = RandomState(seed)
         
         # get graph size
-        n = g_size[0]
-        m = g_size[1]
+        n = int(g_size[0])
+        m = int(g_size[1])
+        
+        # check if it is possible
+        pairs = n * (n - 1) // 2    # number of pairs of nodes
+        if m > pairs:
+            print 'ERROR: there are not enough pairs of nodes for %d arcs' % m
+            return self
         
         # graph type
         if g_type[0] == "directed":
@@ -168,34 +554,259 @@ class Graph(object):
         elif g_type[0] == "undirected":
             self.type = "u"
         
-        # add the required number of nodes
-        for node in range(n):
-            self.add_node()
+        # choose m pairs (i, j), i < j, by their position in the upper triangle
+        k = _unique_sample(pairs, m, rs)
+        start = lambda i: i * (2 * n - i - 1) // 2      # first pair of row i
+        i = array((2 * n - 1 - sqrt((2 * n - 1) ** 2 - 8.0 * k)) // 2, int)
+        i = i - (start(i) > k)
+        i = i + (start(i + 1) <= k)
+        j = k - start(i) + i + 1
         
-        # generate all the arc combinations
-        list = zeros((n * (n - 1), 2), int)
-        pos = 0
-        for i in range(n):
-            for j in range(n):
-                if i != j:
-                     list[pos, :] = array([i + 1, j + 1])
-                     pos += 1
-                     
-        # randomly select m positions and add them as arcs
-        for arc in range(m):
-            pos = random_integers(0, shape(list)[0] - 1)
-            i, j = list[pos, 0], list[pos, 1]
-            self.add_arc(i, j)
-            
-            # delete arc and back arc
-            list = delete(list, s_[pos], axis=0)        # eliminate arc
-            pos = 0
-            while list[pos,0] != j or list[pos,1] != i:
-                pos += 1
-            list = delete(list, s_[pos], axis=0)        # eliminate back arc
+        # build the graph
+        tails, heads = _orient(i + 1, j + 1, self.type == "d", rs)
+        self._set_arcs(n, tails, heads)
+        
+        return self
+    
+    def grid_graph(self, g_size, g_type):
+        """
+        build a grid graph, with arcs from each node to its right and lower
+        neighbors (and coordinates with the position of each node)
+        
+        @type g_size: vector with 2 numbers 
+        @param g_size: size of the grid [rows, columns]
+        
+        @type g_type: list []
+        @param g_type: type of graph - "directed", "undirected"
+        
+        @rtype: graph
+        @return: grid graph
+        """
+        self.__init__(self._dtype)  # clean the graph
+        
+        # get grid size, node (r, c) is r * columns + c + 1
+        rows = int(g_size[0])
+        cols = int(g_size[1])
+        node = arange(rows * cols).reshape(rows, cols) + 1
+        
+        # graph type
+        if g_type[0] == "directed":
+            self.type = "d"
+        elif g_type[0] == "undirected":
+            self.type = "u"
+        
+        # arcs to the right and down
+        tails = append(node[:,:-1].ravel(), node[:-1,:].ravel())
+        heads = append(node[:,1:].ravel(), node[1:,:].ravel())
+        self._set_arcs(rows * cols, tails, heads)
+        
+        # coordinates of each node
+        self.coord = array(vstack([(node.ravel() - 1) % cols,
+                                   (node.ravel() - 1) // cols]).T, float)
+        
+        return self
+    
+    def geometric_graph(self, n, radius, g_type, seed=None):
+        """
+        build a random geometric graph: n random points in the unit square
+        (kept in coord), with an arc between each pair at distance <= radius
+        
+        @type n: number
+        @param n: number of nodes
+        
+        @type radius: number
+        @param radius: largest distance between the nodes of an arc
+        
+        @type g_type: list []
+        @param g_type: type of graph - "directed", "undirected"
+        
+        @type seed: number
+        @param seed: seed of the random numbers (optional)
+        
+        @rtype: graph
+        @return: random geometric graph
+        """
+        self.__init__(self._dtype)  # clean the graph
+        rs = RandomState(seed)
+        
+        # graph type
+        if g_type[0] == "directed":
+            self.type = "d"
+        elif g_type[0] == "undirected":
+            self.type = "u"
+        
+        # random points, in square cells of side >= radius
+        n = int(n)
+        coord = rs.random_sample((n, 2))
+        k = max(1, min(int(1.0 / radius), int(sqrt(n)) + 1))  # cells per side
+        cell = minimum(array(coord * k, int), k - 1)
+        
+        # sort the points by cell (x, y)
+        order = lexsort((cell[:,1], cell[:,0]))
+        cell = cell[order]
+        cell_id = cell[:,0] * k + cell[:,1]
+        count = bincount(cell_id, minlength=k * k)
+        first = cumsum(count) - count       # first point of each cell
+        
+        # compare each point with the points of its cell and the next cells
+        i, j = empty(0, int), empty(0, int)
+        for (dx, dy) in [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]:
+            x, y = cell[:,0] + dx, cell[:,1] + dy
+            ok = (x < k) & (y >= 0) & (y < k)
+            p = flatnonzero(ok)
+            other = (x * k + y)[ok]
+            # all points of the other cell for each point
+            number = count[other]
+            p = repeat(p, number)
+            shift = arange(size(p)) - repeat(cumsum(number) - number, number)
+            q = repeat(first[other], number) + shift
+            # in the same cell take each pair once
+            if (dx, dy) == (0, 0):
+                p, q = p[q > p], q[q > p]
+            i, j = append(i, p), append(j, q)
+        
+        # keep the pairs that are close enough
+        i, j = order[i], order[j]
+        close = ((coord[i] - coord[j]) ** 2).sum(1) <= radius ** 2
+        
+        # build the graph
+        tails, heads = _orient(i[close] + 1, j[close] + 1, self.type == "d", rs)
+        self._set_arcs(n, tails, heads)
+        self.coord = coord
+        
+        return self
+    
+    def layered_graph(self, g_size, p, seed=None):
+        """
+        build a random layered DAG: each arc goes from a node in a layer to
+        a node in the next one with probability p (nodes are numbered layer
+        by layer, so they are in topological order)
+        
+        @type g_size: vector with 2 numbers 
+        @param g_size: size of the graph [layers, nodes per layer]
+        
+        @type p: number
+        @param p: probability of each arc
+        
+        @type seed: number
+        @param seed: seed of the random numbers (optional)
+        
+        @rtype: graph
+        @return: random layered DAG
+        """
+        self.__init__(self._dtype)  # clean the graph
+        rs = RandomState(seed)
+        self.type = "d"
+        
+        # get graph size
+        layers = int(g_size[0])
+        width = int(g_size[1])
+        
+        # choose the arcs among all the pairs of consecutive layers
+        pairs = max(layers - 1, 0) * width * width
+        k = _unique_sample(pairs, rs.binomial(pairs, p), rs)
+        layer, k = divmod(k, width * width)
+        i, j = divmod(k, width)
+        
+        # build the graph
+        tails = layer * width + i + 1
+        heads = (layer + 1) * width + j + 1
+        self._set_arcs(layers * width, tails, heads)
+        
+        # coordinates: layer and position in the layer
+        node = arange(layers * width)
+        self.coord = array(vstack([node // width, node % width]).T, float)
+        
+        return self
+    
+    def power_law_graph(self, g_size, exponent, g_type, seed=None):
+        """
+        build a random graph with a power law degree distribution (Chung-Lu
+        model): the ends of the arcs are chosen with probability proportional
+        to k^(-1 / (exponent - 1)) for node k, without loops or repeated pairs
+        
+        @type g_size: vector with 2 numbers 
+        @param g_size: size of the graph [n = nodes, m = edges]
+        
+        @type exponent: number
+        @param exponent: exponent of the degree distribution (> 2)
+        
+        @type g_type: list []
+        @param g_type: type of graph - "directed", "undirected"
+        
+        @type seed: number
+        @param seed: seed of the random numbers (optional)
+        
+        @rtype: graph
+        @return: random power law graph
+        """
+        self.__init__(self._dtype)  # clean the graph
+        rs = RandomState(seed)
+        
+        # get graph size
+        n = int(g_size[0])
+        m = int(g_size[1])
+        
+        # graph type
+        if g_type[0] == "directed":
+            self.type = "d"
+        elif g_type[0] == "undirected":
+            self.type = "u"
+        
+        # probability of each node
+        weight = (arange(n) + 1.0) ** (-1.0 / (exponent - 1))
+        weight = cumsum(weight / weight.sum())
+        
+        # draw pairs until there are m different ones (or give up)
+        key = empty(0, int)
+        for attempt in range(50):
+            need = m - size(key)
+            if need <= 0:
+                break
+            i = minimum(searchsorted(weight, rs.random_sample(2 * need + 16)), n - 1)
+            j = minimum(searchsorted(weight, rs.random_sample(2 * need + 16)), n - 1)
+            ok = i != j
+            key = append(key, minimum(i, j)[ok] * n + maximum(i, j)[ok])
+            # keep the first draw of each pair
+            key = key[sort(unique(key, return_index=True)[1])]
+        key = key[:m]
+        if size(key) < m:
+            print 'Warning: only %d different arcs were found' % size(key)
+        
+        # build the graph
+        tails, heads = _orient(key // n + 1, key % n + 1, self.type == "d", rs)
+        self._set_arcs(n, tails, heads)
         
         return self
     
+    def _set_arcs(self, n, tails, heads):
+        """
+        set n nodes and the arcs (tails[k], heads[k]), in order of tail and
+        head, building the forward and reverse stars at once
+        
+        @type n: number
+        @param n: number of nodes
+        
+        @type tails: int vector
+        @param tails: tail of each arc
+        
+        @type heads: int vector
+        @param heads: head of each arc
+        """
+        order = lexsort((heads, tails))
+        A = zeros((size(tails), 3), int)
+        A[:,0] = array(tails, int)[order]
+        A[:,1] = array(heads, int)[order]
+        
+        self.N = -1 * ones((n, 2), int)
+        self.A = A
+        self.B = zeros(n)
+        self.coord = zeros((n, 2))
+        
+        self.build_forward_star()
+        self.build_reverse_star()
+        self._sorted = True
+    
     def random_graph_full(self, g_size, g_type, g_param):
         """
         build a random graph
@@ -213,7 +824,7 @@ class Graph(object):
         @rtype: graph
         @return: random generated graph
         """
-        self.__init__()             # clean the graph
+        self.__init__(self._dtype)  # clean the graph
         
         # build a random graph
         self = self.random_graph(g_size, g_type)
@@ -250,7 +861,7 @@ class Graph(object):
         @rtype: graph
         @return: graph formed with N, A, and type      
         """
-        self.__init__()                                 # clean the graph
+        self.__init__(self._dtype)                      # clean the graph
         
         # check that nodes in A and in N match
         n = shape(N)[0]                                 # largest node number in N
@@ -266,11 +877,60 @@ class Graph(object):
             return self
         
         # add N, A, and type to G
-        self.N = matrix(N, int)
-        self.A = matrix(A, int)
+        self.N = array(N, int)
+        self.A = array(A, int)
         self.type = type
         
+        # index the in-arcs of each node
+        self.build_reverse_star()
+        
+        return self
+    
+    def build_forward_star(self):
+        """
+        build the links of the forward star (N and A[:,2]) from the tails
+        in A, linking the out-arcs of each node in ascending position
+        
+        @rtype: graph
+        @return: graph with the forward star
+        """
+        n = self.nodes()            # number of nodes
+        
+        # link the out-arcs of each tail
+        A = array(self.A, int).reshape(-1, 3)
+        N, A[:,2] = _star_links(A[:,0], n, 0)
+        
+        self._store('N', N, True)
+        self._store('A', A, True)
+        self._arc_index_ok = False
+        self.touch()
+        
+        return self
+    
+    def build_reverse_star(self):
+        """
+        build the reverse star of the graph (N_in and in_link) from N and A,
+        linking the in-arcs of each node in ascending position
+        
+        @rtype: graph
+        @return: graph with the reverse star
+        """
+        n = self.nodes()            # number of nodes
+        
+        # link the in-arcs of each head
+        heads = array(self.A[:,1], int).ravel()
+        self.N_in, self.in_link = _star_links(heads, n, -1)
+        self._reverse_ok = True
+        
         return self
+    
+    def _update_reverse_star(self):
+        """
+        build the reverse star again if A or N were replaced since it was
+        built (it is kept up to date when arcs are added or deleted)
+        """
+        if not self._reverse_ok:
+            self.build_reverse_star()
        
     """
     Adding Functions
@@ -433,9 +1093,30 @@ class Graph(object):
         @return: graph with new node
         """
         # append new lines to each relevant matrix
-        self.N = vstack([self.N, [-1, -1]])
-        self.B = append(self.B, 0)
-        self.coord = vstack([self.coord, [0, 0]])
+        self._push('N', [[-1, -1]])
+        self._push('N_in', [[-1, -1]])
+        self._push('B', [0])
+        self._push('coord', [[0, 0]])
+        self.touch()
+        
+        return self
+    
+    def add_nodes(self, k):
+        """
+        add k unconnected nodes to the graph
+        
+        @type k: number
+        @param k: number of nodes to add
+        
+        @rtype: graph
+        @return: graph with new nodes
+        """
+        # append new lines to each relevant matrix
+        self._push('N', -1 * ones((k, 2), int))
+        self._push('N_in', -1 * ones((k, 2), int))
+        self._push('B', zeros(k))
+        self._push('coord', zeros((k, 2)))
+        self.touch()
         
         return self
         
@@ -459,8 +1140,13 @@ class Graph(object):
             print 'ERROR: trying to add an arc to a non existing node'
             return self
         
+        # rebuild the reverse star if A or N were replaced directly
+        self._update_reverse_star()
+        self._own('N')
+        self._own('N_in')
+        
         # add the arc
-        self.A = vstack([self.A, [i, j, 0]])
+        self._push('A', [[i, j, 0]])
         
         m = self.arcs()             # new number of arcs
         
@@ -474,57 +1160,156 @@ class Graph(object):
             self.A[pos,2] = m - 1   # point to the last arc
         self.N[i-1,1] = m - 1       # correct end_data point
         
+        # add the arc at the end of the in-arc list of j
+        self._push('in_link', [-1])
+        pos = self.N_in[j-1,1]      # previous to last in-arc of j
+        if pos == -1:
+            self.N_in[j-1,0] = m - 1
+        else:
+            self.in_link[pos] = m - 1
+        self.N_in[j-1,1] = m - 1
+        
+        self.touch()
+        
+        # the arcs are still sorted if it goes after the previous arc
+        if self._sorted and m > 1:
+            self._sorted = (self.A[m-2,0], self.A[m-2,1]) <= (i, j)
+        
+        # add the arc to the index, unless (i, j) was already there
+        if self._arc_index is not None and self._arc_index_ok:
+            self._arc_index.setdefault((i, j), m - 1)
+        
         # pad with zeros in data where needed
         if size(self.c) != 0:
-            self.c = append(self.c, 0)
+            self._push('c', [0])
         if size(self.u) != 0:
-            self.u = append(self.u, 0)
+            self._push('u', [0])
         if size(self.f) != 0:
-            self.f = append(self.f, 0)
+            self._push('f', [0])
         if size(self.mirror) != 0:
-            self.mirror = append(self.mirror, 0)
+            self._push('mirror', [0])
         
         return self
     
-    def add_data_to_arc_pos(self, pos, c, u, f):
+    def add_arcs(self, I, J, c=None, u=None, f=None):
         """
-        adds data to a specified arc position
+        add the arcs (I[k], J[k]) to the graph at once, in that order, with
+        their data (set to 0 if not given)
         
-        @type pos: number (int)
-        @param pos: arc position in the Adjacency matrix
+        @type I: number vector
+        @param I: nodes at the tail of the arcs
         
-        @type c: number
-        @param c: arc cost
+        @type J: number vector
+        @param J: nodes at the head of the arcs
         
-        @type u: number
-        @param u: arc capacity
+        @type c: number vector
+        @param c: cost of each arc (optional)
         
-        @type f: number
-        @param f: arc flow
+        @type u: number vector
+        @param u: capacity of each arc (optional)
+        
+        @type f: number vector
+        @param f: flow of each arc (optional)
         
         @rtype: graph
-        @return: graph with new arc values
+        @return: graph with new arcs
         """
-        m = self.arcs()             # number of arcs
+        I = array(I, int).ravel()
+        J = array(J, int).ravel()
+        n = self.nodes()            # number of nodes
+        k = size(I)                 # number of new arcs
         
-        # check if pos is viable
-        if pos >= m:
-            print "ERROR: selected position does not exist in A"
+        # check if it is possible
+        if size(J) != k:
+            print 'ERROR: the number of tails and heads do not match'
             return self
+        for (name, data) in [('c', c), ('u', u), ('f', f)]:
+            if data is not None and size(data) != k:
+                print 'ERROR: the number of values in %s and arcs do not match' % name
+                return self
+        if k == 0:
+            return self
+        if min(I.min(), J.min()) < 1 or max(I.max(), J.max()) > n:
+            print 'ERROR: trying to add an arc to a non existing node'
+            return self
+        
+        # rebuild the reverse star if A or N were replaced directly
+        self._update_reverse_star()
+        self._own('N')
+        self._own('N_in')
+        
+        m = self.arcs()             # number of arcs
+        
+        # add the arcs, and link them after the arcs of their tails and heads
+        A = zeros((k, 3), int)
+        A[:,0] = I
+        A[:,1] = J
+        self._push('A', A)
+        self._push('in_link', -1 * ones(k, int))
+        view = self._view
+        _append_links(view['N'], view['A'][:,2], I, m, 0)
+        _append_links(view['N_in'], view['in_link'], J, m, -1)
+        self._arc_index_ok = False
+        self._sorted = False
+        self.touch()
+        
+        # add the data, or pad with zeros where needed
+        for (name, data) in [('c', c), ('u', u), ('f', f)]:
+            if size(self._view[name]) != 0 or (m == 0 and data is not None):
+                if data is None:
+                    data = zeros(k)
+                self._push(name, ravel(data))
+            elif data is not None:
+                print "Warning: %s was not added as no %s vector exists in G" % (name, name)
+        if size(self.mirror) != 0:
+            self._push('mirror', zeros(k, int))
+        
+        return self
+    
+    def add_data_to_arc_pos(self, pos, c, u, f):
+        """
+        adds data to a specified arc position
+        
+        @type pos: number (int)
+        @param pos: arc position in the Adjacency matrix
+        
+        @type c: number
+        @param c: arc cost
+        
+        @type u: number
+        @param u: arc capacity
+        
+        @type f: number
+        @param f: arc flow
+        
+        @rtype: graph
+        @return: graph with new arc values
+        """
+        m = self.arcs()             # number of arcs
+        
+        # check if pos is viable
+        if pos >= m:
+            print "ERROR: selected position does not exist in A"
+            return self
+        for name in ['c', 'u', 'f']:
+            self._own(name)
         
         # add data
         if size(self.c) != 0:
             self.c[pos] = c
+            self.touch('c')
         else:
             print "Warning: c was not added as no c vector exists in G"
         
         if size(self.u) != 0:
             self.u[pos] = u
+            self.touch('u')
         else:
             print "Warning: u was not added as no u vector exists in G"
         
         if size(self.f) != 0:
             self.f[pos] = f
+            self.touch('f')
         else:
             print "Warning: f was not added as no f vector exists in G"
             
@@ -549,6 +1334,65 @@ class Graph(object):
             self.type = type
         
         return self
+    
+    def set_compact(self, flag=True, data_type=float64):
+        """
+        turn on/off the compact mode, that keeps the node and arc indices
+        as int32 and the node and arc data (B, c, u, f, coord) as data_type
+        
+        @type flag: boolean
+        @param flag: true to use the compact mode, false to use int and
+                     float64 arrays
+        
+        @type data_type: type
+        @param data_type: float64 or float32
+        
+        @rtype: graph
+        @return: graph in compact mode
+        """
+        index, data = int32, dtype(data_type)
+        if not flag:
+            index, data = dtype(int), dtype(float64)
+        
+        # type of each array
+        self._dtype = {}
+        for name in ['N', 'A', 'N_in', 'in_link', 'mirror']:
+            self._dtype[name] = index
+        for name in ['B', 'c', 'u', 'f', 'coord']:
+            self._dtype[name] = data
+        
+        # convert the arrays
+        for name in self._view.keys():
+            self._store(name, self._view[name], self._owned[name])
+        
+        # out of the compact mode the arrays are not converted any more
+        if not flag:
+            self._dtype = {}
+        
+        return self
+    
+    def set_arc_index(self, flag=True):
+        """
+        turn on/off the index of arcs by their end nodes, used to find the
+        position of arc (i, j) in constant time instead of going over the
+        out-arcs of i (it is kept up to date when arcs are deleted, and
+        rebuilt on first use after they are moved)
+        
+        @type flag: boolean
+        @param flag: true to use the index, false to drop it
+        
+        @rtype: graph
+        @return: graph with/without the index
+        """
+        if flag:
+            if self._arc_index is None:
+                self._arc_index = {}
+                self._arc_index_ok = False
+        else:
+            self._arc_index = None
+            self._arc_index_ok = False
+        
+        return self
         
     """
     Deleting Functions
@@ -557,48 +1401,74 @@ class Graph(object):
         """
         delete arc in position pos
         
+        @note: the arc is unlinked and marked as deleted in O(degree), the
+               arc arrays are compacted before they are used again
+        
         @type pos: number
         @param pos: position of arc to delete
         
         @rtype: graph
         @return: graph without the arc
         """
-        m = self.arcs()
-        n = self.nodes()
+        A = self._view['A']
+        m = shape(A)[0] - self._dead        # number of arcs
         
         # check if it is a valid position
         if pos >= m:
             print "ERROR: the position is not valid"
             return self
         
-        # initialize temporal graph
-        tG = Graph()
-        tG.N = -1 * ones((n, 2), int)       # add all nodes without arcs
+        # unlink the arc and compact if too many arcs are deleted
+        self._kill_arc(self._buffer_pos(int(pos)))
+        self._check_compact()
         
-        # add arcs one by one, skipping pos
-        for arc in range(m):
-            # get arc information
-            if arc != pos:
-                i = self.A[arc, 0]
-                j = self.A[arc, 1]
-                tG.add_arc(i, j)
+        return self
+    
+    def del_arcs(self, positions):
+        """
+        delete the arcs in a set of positions at once
         
-        # put N and A back into the graph
-        self.A = tG.A
-        self.N = tG.N
+        @type positions: number vector
+        @param positions: positions of arcs to delete
         
-        # delete cost
-        if size(self.c) != 0:
-            self.c = delete(self.c, [pos])
-        # delete capacity
-        if size(self.u) != 0:
-            self.u = delete(self.u, [pos])
-        # delete flow
-        if size(self.f) != 0:
-            self.f = delete(self.f, [pos])
-        # delete mirror
+        @rtype: graph
+        @return: graph without the arcs
+        """
+        positions = unique(array(positions, int).ravel())
+        m = self.arcs()             # number of arcs
+        
+        # check if they are valid positions
+        if size(positions) == 0:
+            return self
+        if positions[0] < 0 or positions[-1] >= m:
+            print "ERROR: the position is not valid"
+            return self
+        
+        # a few arcs are just unlinked
+        if size(positions) <= self.compact_ratio * m:
+            for pos in positions:
+                self._kill_arc(pos)
+            self._check_compact()
+            return self
+        
+        # otherwise keep the other arcs and link them again (in the same order)
+        in_order = self._sorted
+        keep = ones(m, bool)
+        keep[positions] = False
+        new_pos = cumsum(keep) - 1          # new position of each arc
+        
+        self.A = self.A[keep]
+        for name in ['c', 'u', 'f']:
+            if size(self._view[name]) != 0:
+                self._store(name, self._view[name][keep], True)
+        # mirror arcs that were deleted are set to 0
         if size(self.mirror) != 0:
-            self.mirror = delete(self.mirror, [pos])
+            mirror = array(self.mirror[keep], int)
+            self.mirror = where(keep[mirror], new_pos[mirror], 0)
+        
+        self.build_forward_star()
+        self.build_reverse_star()
+        self._sorted = in_order
         
         return self
     
@@ -615,15 +1485,17 @@ class Graph(object):
         @rtype: graph
         @return: graph without the arc (i, j)
         """
-        # get the position of the arc
-        pos = self.get_arc_pos(i, j)
+        # get the position of the arc in the buffers
+        pos = self._find_arc(i, j)
         
         # if the arc doesn't exist, return
-        if pos == []:
+        if pos == -1:
+            print 'Arc (%d, %d) does not exist' % (i, j)
             return self
         
         # otherwise delete the arc
-        self.del_arc_pos(pos)
+        self._kill_arc(pos)
+        self._check_compact()
         
         return self
     
@@ -637,33 +1509,250 @@ class Graph(object):
         @rtype: graph
         @return: graph without the node and adjacent arcs
         """
-        # delete all out-arcs
-        list = self.get_out_arcs_pos(i)
-        while size(list) != 0:
-            self.del_arc_pos(list[0])
-            list = self.get_out_arcs_pos(i)
-        
-        # delete all in-arcs
-        list = self.get_in_arcs_pos(i)
-        while size(list) != 0:
-            self.del_arc_pos(list[0])
-            list = self.get_in_arcs_pos(i)
+        # delete all out-arcs and in-arcs
+        list = self.get_adjacent_arcs_pos(i)
+        for arc in list:
+            self._kill_arc(arc)
         
         # eliminate the node
-        self.N = delete(self.N, [i-1], axis=0)
+        self._store('N', delete(self._view['N'], [i-1], axis=0))
+        self._store('N_in', delete(self._view['N_in'], [i-1], axis=0))
         self.coord = delete(self.coord, [i-1], axis=0)
         self.B = delete(self.B, i-1)
         
-        # correct node names in A
-        m = self.arcs()
-        for arc in range(m):
-            if self.A[arc,0] > i:
-                self.A[arc,0] = self.A[arc,0] - 1
-            if self.A[arc,1] > i:
-                self.A[arc,1] = self.A[arc,1] - 1
+        # correct node names in A (deleted arcs have tail and head 0)
+        self._own('A')
+        A = self._view['A']
+        A[:,0] = A[:,0] - (A[:,0] > i)
+        A[:,1] = A[:,1] - (A[:,1] > i)
+        self._arc_index_ok = False
+        self.touch()
+        
+        self._check_compact()
+        
+        return self
+    
+    def compact(self):
+        """
+        remove the deleted arcs from the arc arrays, moving the other arcs
+        down to fill the gaps (positions change, their order does not)
+        
+        @rtype: graph
+        @return: graph without deleted arcs
+        """
+        if self._dead == 0:
+            return self
+        self._dead = 0
+        self._arc_index_ok = False          # arcs change positions
+        
+        view = self._view
+        alive = view['A'][:,0] != 0         # arcs that were not deleted
+        new_pos = cumsum(alive) - 1         # new position of each arc
+        
+        # keep the arcs and correct the links to the next arc
+        A = view['A'][alive]
+        link = array(A[:,2], int)
+        A[:,2] = where(link == 0, 0, new_pos[link])
+        self._store('A', A, True)
+        
+        # correct the first and last arc of each node
+        N = array(view['N'], int)
+        self._store('N', where(N == -1, -1, new_pos[N]), True)
+        N_in = array(view['N_in'], int)
+        self._store('N_in', where(N_in == -1, -1, new_pos[N_in]), True)
+        in_link = array(view['in_link'][alive], int)
+        self._store('in_link', where(in_link == -1, -1, new_pos[in_link]), True)
+        
+        # keep the data of the arcs
+        for name in ['c', 'u', 'f']:
+            if size(view[name]) != 0:
+                self._store(name, view[name][alive], True)
+        # mirror arcs that were deleted are set to 0
+        if size(view['mirror']) != 0:
+            mirror = array(view['mirror'][alive], int)
+            self._store('mirror', where(alive[mirror], new_pos[mirror], 0), True)
         
         return self
     
+    def _kill_arc(self, pos):
+        """
+        unlink the arc in buffer position pos from the out-arcs of its tail
+        and the in-arcs of its head, and mark it as deleted
+        
+        @type pos: number
+        @param pos: position of the arc in the buffers
+        """
+        view = self._view
+        
+        # the reverse star must match the buffers
+        self._update_reverse_star()
+        for name in ['A', 'N', 'N_in', 'in_link']:
+            self._own(name)
+        A, N = view['A'], view['N']
+        N_in, in_link = view['N_in'], view['in_link']
+        
+        i = int(A[pos,0])                   # tail of the arc
+        j = int(A[pos,1])                   # head of the arc
+        
+        # unlink it from the out-arcs of i
+        link = A[pos,2]
+        if N[i-1,0] == pos:
+            if link == 0:
+                N[i-1,:] = [-1, -1]         # it was the only arc of i
+            else:
+                N[i-1,0] = link
+        else:
+            prev = N[i-1,0]
+            while A[prev,2] != pos:
+                prev = A[prev,2]
+            A[prev,2] = link
+            if N[i-1,1] == pos:
+                N[i-1,1] = prev
+        
+        # unlink it from the in-arcs of j
+        link = in_link[pos]
+        if N_in[j-1,0] == pos:
+            if link == -1:
+                N_in[j-1,:] = [-1, -1]      # it was the only in-arc of j
+            else:
+                N_in[j-1,0] = link
+        else:
+            prev = N_in[j-1,0]
+            while in_link[prev] != pos:
+                prev = in_link[prev]
+            in_link[prev] = link
+            if N_in[j-1,1] == pos:
+                N_in[j-1,1] = prev
+        
+        # the index keeps the next parallel arc (i, j), if there is one
+        if self._arc_index_ok and self._arc_index.get((i, j)) == pos:
+            link = A[pos,2]
+            while link != 0 and A[link,1] != j:
+                link = A[link,2]
+            if link == 0:
+                del self._arc_index[(i, j)]
+            else:
+                self._arc_index[(i, j)] = int(link)
+        
+        # mark it as deleted
+        A[pos,:] = [0, 0, 0]
+        in_link[pos] = -1
+        self._dead += 1
+        if self._live is not None:
+            tree = self._live
+            k = pos + 1
+            while k < len(tree):
+                tree[k] -= 1
+                k += k & -k
+        self.touch()
+    
+    def touch(self, name=None):
+        """
+        record a change of the graph, forgetting the data derived from the
+        changed array (or from all of them)
+        
+        @note: the graph calls it itself, and get_writable() calls it, but
+               changes made in place to its arrays from outside
+               (G.c[pos] = 0) must be followed by it
+        
+        @type name: string
+        @param name: name of the changed array (None if the nodes or arcs
+                     changed)
+        """
+        self._version += 1
+        if name in (None, 'A', 'N', 'N_in', 'in_link'):
+            self._memo = {}
+            self._adjacency = None
+        else:
+            for key in self._memo.keys():
+                if key[0] == name:
+                    del self._memo[key]
+    
+    def get_version(self):
+        """
+        number of changes made to the graph, to tell if it changed since
+        it was last used
+        
+        @rtype: number
+        @return: version of the graph
+        """
+        return self._version
+    
+    def _check_compact(self):
+        """
+        compact the arc arrays if the deleted arcs are more than
+        compact_ratio of the arcs in the buffers
+        """
+        if self._dead > self.compact_ratio * shape(self._view['A'])[0]:
+            self.compact()
+    
+    def _live_tree(self):
+        """
+        Fenwick tree of the arcs in the buffers that are not deleted (kept
+        until arcs are added or moved), so the positions of the arcs can be
+        found without compacting the buffers
+        
+        @rtype: list
+        @return: tree[k] = arcs not deleted in buffer positions
+                 [k - (k & -k), k)
+        """
+        if self._live is None:
+            alive = self._view['A'][:,0] != 0
+            count = zeros(size(alive) + 1, int)
+            count[1:] = cumsum(alive)
+            k = arange(size(count))
+            self._live = (count - count[k - (k & -k)]).tolist()
+        
+        return self._live
+    
+    def _buffer_pos(self, pos):
+        """
+        position in the buffers of the arc in position pos
+        
+        @type pos: number
+        @param pos: position of the arc, skipping deleted arcs
+        
+        @rtype: number
+        @return: position of the arc in the buffers
+        """
+        if self._dead == 0:
+            return pos
+        
+        # go down the tree, leaving pos arcs not deleted before the arc
+        tree = self._live_tree()
+        buffer_pos = 0
+        step = 1 << len(tree).bit_length()
+        while step:
+            if buffer_pos + step < len(tree) and tree[buffer_pos + step] <= pos:
+                buffer_pos += step
+                pos -= tree[buffer_pos]
+            step >>= 1
+        
+        return buffer_pos
+    
+    def _arc_pos(self, buffer_pos):
+        """
+        position of the arc in position buffer_pos of the buffers
+        
+        @type buffer_pos: number
+        @param buffer_pos: position of the arc in the buffers
+        
+        @rtype: number
+        @return: position of the arc, skipping deleted arcs
+        """
+        if self._dead == 0:
+            return buffer_pos
+        
+        # count the arcs not deleted before it
+        tree = self._live_tree()
+        pos = 0
+        k = buffer_pos
+        while k > 0:
+            pos += tree[k]
+            k -= k & -k
+        
+        return pos
+    
     def strip_cost(self):
         """
         eliminate the cost vector
@@ -718,121 +1807,73 @@ class Graph(object):
     """
     File I/O Functions
     """
-    def form_graph_from_file(self, file_name):
+    def form_graph_from_file(self, file_name, skip=''):
         """
         load graph information from data file
         
+        @note: files ending in .npz are read as binary graphs, and
+               directories are opened as memory-mapped graphs (text files
+               ending in .gz are read compressed)
+        
         @type file_name: string
         @param file_name: name of the file with the graph data
         
+        @type skip: string
+        @param skip: optional sections not to read, by their letter (c, u,
+                     f, x or B, e.g. 'x' to skip the coordinates)
+        
         @rtype: graph
         @return: graph
         """
-        # initialize temporal variables
-        N = []
-        A = []
-        B = []
-        c = []
-        u = []
-        f = []
-        coord = []
-        
-        file = open(file_name)           # open data file
-        mode = 0                         # initialize mode
-        
-        # read each line of text file and put values in corresponding variables
-        for line in file.xreadlines():
-            # identify the area of the text file
-            if line[0] == "#" or line[0] == "\r\n":
-                mode = 0
-            elif line[0] == "N":
-                mode = 1
-            elif line[0] == "A":
-                mode = 2
-            elif line[0] == "c":
-                mode = 3
-            elif line[0] == "u":
-                mode = 4
-            elif line[0] == "f":
-                mode = 5
-            elif line[0] == "x":
-                mode = 6
-            elif line[0] == "B":
-                mode = 7
+        # binary graphs are read as arrays
+        if file_name.endswith('.npz'):
+            return self._form_graph_from_npz(file_name)
+        if os.path.isdir(file_name):
+            return self._form_graph_from_dir(file_name)
+        
+        # rows read for each section of the file
+        rows = {}
+        for section in 'NAcufxB':
+            rows[section] = []
+        # nodes and arcs are integers, everything else is real
+        kind = {'N': int, 'A': int}
+        
+        type = 'x'                       # set as none
+        section = None                   # initialize section
+        
+        # read each line of text file, converting each row in one step
+        file = _open_text(file_name)
+        for line in file:
+            if line[0] == "[":
+                if section is not None and section not in skip:
+                    line = line.strip('[] \t\r\n')
+                    row = fromstring(line, kind.get(section, float), sep=',')
+                    rows[section].append(row)
+            elif line[0] in rows:        # identify the area of the text file
+                section = line[0]
             elif line[0] == "t":
-                mode = 0
+                section = None
                 type = line[2]           # get the type
-            
-            # depending on the area, append data to the corresponding variable
-            if line[0] == "[":
-                if mode == 1:            # N       
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    N_line = [int(x) for x in line.split(',')]
-                    N.append(N_line)
-                elif mode == 2:          # A
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    A_line = [int(x) for x in line.split(',')]
-                    A.append(A_line)
-                elif mode == 3:          # c
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    c = [float(x) for x in line.split(',')]
-                elif mode == 4:          # u
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    u = [float(x) for x in line.split(',')]
-                elif mode == 5:          # f
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    f = [float(x) for x in line.split(',')]
-                elif mode == 6:          # x
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    x_line = [float(x) for x in line.split(',')]
-                    coord.append(x_line)
-                elif mode == 7:          # B
-                    # clean both sides
-                    line = line.lstrip('[')
-                    line = line.rstrip(']\r\n')
-                    # get the numbers
-                    B = [float(x) for x in line.split(',')]
-        
-        # transform arrays to matrices and transpose
-        N = matrix(N)
-        N = N.T
-        A = matrix(A)
-        A = A.T
-        
-        # build graph
+            elif line[0] == "#":
+                section = None
+        file.close()
+        
+        # build graph (rows of N and A are transposed)
+        N = vstack(rows['N']).T
+        A = vstack(rows['A']).T
         self.form_graph(N, A, type)
         
         # add data if it exists
-        if c != []:
-            self.add_cost(array(c))
-        if u != []:
-            self.add_capacity(array(u))
-        if f != []:
-            self.add_flow(array(f))
-        if coord != []:
-            coord = matrix(coord)
-            coord = coord.T
-            self.add_coordinates(coord)
-        if B != []:
-            self.add_external_flow(array(B))
+        if rows['c'] != []:
+            self.add_cost(rows['c'][-1])
+        if rows['u'] != []:
+            self.add_capacity(rows['u'][-1])
+        if rows['f'] != []:
+            self.add_flow(rows['f'][-1])
+        if rows['x'] != []:
+            self.add_coordinates(vstack(rows['x']).T)
+        if rows['B'] != []:
+            self.add_external_flow(rows['B'][-1])
         
         return self
     
@@ -840,6 +1881,10 @@ class Graph(object):
         """
         save graph information to data file
         
+        @note: files ending in .npz are written as binary graphs, and
+               directories (or names ending in /) as memory-mapped graphs
+               (text files ending in .gz are written compressed)
+        
         @type file_name: string
         @param file_name: name of the file with the graph data
         
@@ -851,67 +1896,380 @@ class Graph(object):
         if n == 0:
             # if there is no graph to store, skip
             return self
+        
+        # binary graphs are written as arrays
+        if file_name.endswith('.npz'):
+            return self._save_graph_to_npz(file_name)
+        if os.path.isdir(file_name) or file_name.endswith(('/', os.sep)):
+            return self._save_graph_to_dir(file_name)
             
         # open the file for saving
-        text_file = open(file_name, "w")
+        text_file = _open_text(file_name, "w")
+        
+        # graph type
+        text_file.write("# graph type\n")
+        text_file.write("t %s\n" % (self.type))
+        
+        # graph nodes
+        text_file.write("\n# Node data points\nN\n")
+        _write_vector(text_file, self.N[:,0].astype(int))
+        _write_vector(text_file, self.N[:,1].astype(int))
+        
+        # external flow on nodes
+        text_file.write("\n# External Flows\nB\n")
+        _write_vector(text_file, self.B)
+        
+        # graph adjacency matrix
+        text_file.write("\n# Adjacency matrix\n")
+        if size(self.A) != 0:
+            text_file.write("A\n")
+            for k in range(3):
+                _write_vector(text_file, self.A[:,k].astype(int))
+        
+        # other information
+        text_file.write("\n# graph elements: cost, capacity, flow\n")
+        # costs
+        if size(self.c) != 0:
+            text_file.write("c\n")
+            _write_vector(text_file, self.c)
+        # capacity
+        if size(self.u) != 0:
+            text_file.write("u\n")
+            _write_vector(text_file, self.u)
+        # flow
+        if size(self.f) != 0:
+            text_file.write("f\n")
+            _write_vector(text_file, self.f)
+        # coordinates
+        text_file.write("\n# coordinates for draw\n")
+        if size(self.coord) != 0:
+            text_file.write("x\n")
+            _write_vector(text_file, self.coord[:,0])
+            _write_vector(text_file, self.coord[:,1])
+        
+        # close the file
+        text_file.close()
+        
+        return self
+    
+    def _form_graph_from_npz(self, file_name):
+        """
+        load graph information from a binary file written by
+        save_graph_to_file(), taking its arrays as they are
+        
+        @type file_name: string
+        @param file_name: name of the .npz file with the graph data
+        
+        @rtype: graph
+        @return: graph
+        """
+        self.__init__(self._dtype)      # clean the graph
+        data = load(file_name)
+        
+        # check that nodes in A and in N match
+        N = data['N']
+        A = data['A']
+        if size(A) != 0 and A[:,:2].max() > shape(N)[0]:
+            print 'ERROR: nodes in A are outside the range of N'
+            data.close()
+            return self
+        
+        # add the arrays as they were saved
+        self.N = N
+        self.A = A
+        for name in ['B', 'c', 'u', 'f', 'coord', 'mirror']:
+            setattr(self, name, data[name])
+        self.type = str(data['type'])
+        self.source = data['source'].tolist()
+        self.sink = data['sink'].tolist()
+        data.close()
+        
+        # index the in-arcs of each node
+        self.build_reverse_star()
+        
+        return self
+    
+    def _save_graph_to_npz(self, file_name):
+        """
+        save graph information to a binary file, with one array for each
+        graph array
+        
+        @type file_name: string
+        @param file_name: name of the .npz file with the graph data
+        
+        @rtype: graph
+        @return: saved graph
+        """
+        savez(file_name, type=self.type, N=self.N, A=self.A, B=self.B,
+              c=self.c, u=self.u, f=self.f, coord=self.coord,
+              mirror=self.mirror, source=self.source, sink=self.sink)
+        
+        return self
+    
+    def _form_graph_from_dir(self, dir_name):
+        """
+        open a graph saved in a directory, mapping its arrays from the
+        disk instead of reading them (only the pages used are read)
+        
+        @note: the arrays are mapped copy-on-write: the file is never
+               changed, and only the pages changed in place are kept in
+               memory, so algorithms may work over the graph directly
+        
+        @type dir_name: string
+        @param dir_name: name of the directory with the graph data
+        
+        @rtype: graph
+        @return: graph
+        """
+        self.__init__(self._dtype)      # clean the graph
+        
+        # map the arrays as they were saved, with their arc lists
+        for name in self._buffer.keys():
+            data = load(os.path.join(dir_name, name + '.npy'), mmap_mode='c')
+            self._store(name, data, True)
+        
+        # small values are read
+        read = lambda name: load(os.path.join(dir_name, name + '.npy'))
+        self.type = str(read('type'))
+        self.source = read('source').tolist()
+        self.sink = read('sink').tolist()
+        self._sorted = bool(read('sorted'))
+        
+        return self
+    
+    def _save_graph_to_dir(self, dir_name):
+        """
+        save graph information to a directory, with one .npy file for each
+        graph array (arc lists included), so it can be mapped by
+        form_graph_from_file()
+        
+        @type dir_name: string
+        @param dir_name: name of the directory with the graph data
+        
+        @rtype: graph
+        @return: saved graph
+        """
+        if not os.path.isdir(dir_name):
+            os.makedirs(dir_name)
+        
+        self.compact()                  # remove the deleted arcs
+        self._update_reverse_star()
+        
+        # graph arrays
+        for name in self._view:
+            save(os.path.join(dir_name, name + '.npy'), self._view[name])
+        # other values
+        save(os.path.join(dir_name, 'type.npy'), self.type)
+        save(os.path.join(dir_name, 'source.npy'), self.source)
+        save(os.path.join(dir_name, 'sink.npy'), self.sink)
+        save(os.path.join(dir_name, 'sorted.npy'), self._sorted)
+        
+        return self
+    
+    def form_graph_from_dimacs(self, file_name):
+        """
+        load a flow problem in DIMACS format, reading the file by chunks
+        and adding the arcs of each chunk at once
+        
+        @note: max flow problems (p max) give the source and sink in the
+               n lines, min cost flow problems (p min) the external flow
+               of the nodes; lower bounds of the arcs are not used
+        
+        @type file_name: string
+        @param file_name: name of the DIMACS file
+        
+        @rtype: graph
+        @return: graph
+        """
+        self.__init__(self._dtype)      # clean the graph
+        self.type = 'd'
+        problem = ''
+        
+        file = _open_text(file_name)
+        lines = file.readlines(_READ_CHUNK)
+        while lines:
+            arc_lines = []              # a lines of the chunk
+            node_lines = []             # n lines of the chunk (p min)
+            for line in lines:
+                if line[0] == 'a':
+                    arc_lines.append(line[1:])
+                elif line[0] == 'n':
+                    if problem == 'min':
+                        node_lines.append(line[1:])
+                    else:
+                        node, end = line.split()[1:3]
+                        if end == 's':
+                            self.source = int(node)
+                        elif end == 't':
+                            self.sink = int(node)
+                elif line[0] == 'p':
+                    problem, n = line.split()[1:3]
+                    self.add_nodes(int(n))
+            
+            # external flows: node, flow
+            if node_lines != []:
+                node_data = fromstring(''.join(node_lines), float, sep=' ')
+                node_data = node_data.reshape(-1, 2)
+                self._own('B')
+                self.B[array(node_data[:,0], int) - 1] = node_data[:,1]
+                self.touch('B')
+            
+            # arcs: tail, head, capacity (p max) or tail, head, lower
+            # bound, capacity, cost (p min)
+            if arc_lines != []:
+                arc_data = fromstring(''.join(arc_lines), float, sep=' ')
+                if problem == 'min':
+                    arc_data = arc_data.reshape(-1, 5)
+                    if any(arc_data[:,2] != 0):
+                        print 'Warning: lower bounds of the arcs are not used'
+                    self.add_arcs(arc_data[:,0], arc_data[:,1],
+                                  c=arc_data[:,4], u=arc_data[:,3])
+                else:
+                    arc_data = arc_data.reshape(-1, 3)
+                    self.add_arcs(arc_data[:,0], arc_data[:,1],
+                                  u=arc_data[:,2])
+            
+            lines = file.readlines(_READ_CHUNK)
+        file.close()
+        
+        return self
+    
+    def save_graph_to_dimacs(self, file_name):
+        """
+        save the graph as a flow problem in DIMACS format: a min cost flow
+        problem if it has costs, or a max flow problem from its source to
+        its sink otherwise
+        
+        @type file_name: string
+        @param file_name: name of the DIMACS file
+        
+        @rtype: graph
+        @return: saved graph
+        """
+        n = self.nodes()
+        m = self.arcs()
+        
+        # check if it is possible
+        if size(self.u) == 0:
+            print 'ERROR: the graph has no capacities'
+            return self
+        if size(self.c) == 0 and (self.source == [] or self.sink == []):
+            print 'ERROR: the graph has no costs, or no source or sink set'
+            return self
+        
+        tails, heads = self._arc_ends()
+        text_file = _open_text(file_name, "w")
+        
+        if size(self.c) != 0:
+            # min cost flow: external flows and arcs with lower bound 0
+            text_file.write("p min %d %d\n" % (n, m))
+            B = zeros(n) if size(self.B) == 0 else self.B
+            nodes = flatnonzero(B)
+            savetxt(text_file, column_stack((nodes + 1, B[nodes])),
+                    fmt='n %d %.17g')
+            savetxt(text_file, column_stack((tails, heads, zeros(m),
+                    self.u, self.c)), fmt='a %d %d %d %.17g %.17g')
+        else:
+            # max flow: source, sink and arcs with capacity
+            text_file.write("p max %d %d\n" % (n, m))
+            for node in ravel(self.source):
+                text_file.write("n %d s\n" % node)
+            for node in ravel(self.sink):
+                text_file.write("n %d t\n" % node)
+            savetxt(text_file, column_stack((tails, heads, self.u)),
+                    fmt='a %d %d %.17g')
+        
+        text_file.close()
+        
+        return self
+    
+    def form_graph_from_edge_list(self, file_name, type='d'):
+        """
+        load a graph from an edge list (one 'i j' or 'i j cost' line for
+        each arc, lines starting with # or % are comments), reading the
+        file by chunks
+        
+        @note: the nodes are numbered 1..n in the order of their ids in the
+               file, and the ids are kept as the names of the nodes
+        
+        @type file_name: string
+        @param file_name: name of the edge list file
+        
+        @type type: character
+        @param type: graph type
+        
+        @rtype: graph
+        @return: graph
+        """
+        self.__init__(self._dtype)      # clean the graph
+        self.type = type
+        
+        chunks = []                     # arcs read from each chunk
+        columns = 0                     # numbers in each line
+        
+        file = _open_text(file_name)
+        lines = file.readlines(_READ_CHUNK)
+        while lines:
+            lines = [line for line in lines if line[0] not in '#%\r\n']
+            if lines != []:
+                if columns == 0:
+                    columns = len(lines[0].split())
+                data = fromstring(''.join(lines), float, sep=' ')
+                chunks.append(data.reshape(-1, columns))
+            lines = file.readlines(_READ_CHUNK)
+        file.close()
+        
+        if chunks == []:
+            return self
+        data = vstack(chunks)
+        
+        # number the nodes by their ids
+        ids, ends = unique(array(data[:,:2], int), return_inverse=True)
+        ends = ends.reshape(-1, 2) + 1
+        
+        self.add_nodes(size(ids))
+        self.names = ids.tolist()
+        if columns > 2:
+            self.add_arcs(ends[:,0], ends[:,1], c=data[:,2])
+        else:
+            self.add_arcs(ends[:,0], ends[:,1])
         
-        # graph type
-        text_file.write("# graph type\n")
-        text_file.write("t %s\n" % (self.type))
+        return self
+    
+    def save_graph_to_edge_list(self, file_name):
+        """
+        save the graph as an edge list, one 'i j' line for each arc (or
+        'i j cost' if it has costs)
         
-        # graph nodes
-        text_file.write("\n# Node data points\nN\n")
-        N = array(self.N.T, int)
-        line = list(N[0,:])
-        text_file.write("%s\n" %(line))
-        line = list(N[1,:])
-        text_file.write("%s\n" %(line))
+        @note: the nodes are written by their names if all of them have
+               a number as name, or by their number otherwise
         
-        # external flow on nodes
-        text_file.write("\n# External Flows\nB\n")
-        line = list(self.B)
-        text_file.write("%s\n" %(line))
+        @type file_name: string
+        @param file_name: name of the edge list file
         
-        # graph adjacency matrix
-        text_file.write("\n# Adjacency matrix\n")
-        if size(self.A) != 0:
-            text_file.write("A\n")
-            A = array(self.A.T, int)
-            line = list(A[0,:])
-            text_file.write("%s\n" %(line))
-            line = list(A[1,:])
-            text_file.write("%s\n" %(line))
-            line = list(A[2,:])
-            text_file.write("%s\n" %(line))
+        @rtype: graph
+        @return: saved graph
+        """
+        n = self.nodes()
+        m = self.arcs()
         
-        # other information
-        text_file.write("\n# graph elements: cost, capacity, flow\n")
-        # costs
+        # node ids
+        ids = arange(1, n + 1)
+        if len(self.names) == n:
+            try:
+                ids = array(self.names, int)
+            except (TypeError, ValueError):
+                pass
+        
+        tails, heads = self._arc_ends()
+        text_file = _open_text(file_name, "w")
+        text_file.write("# Nodes: %d Edges: %d\n" % (n, m))
         if size(self.c) != 0:
-            text_file.write("c\n")
-            line = list(self.c)
-            text_file.write("%s\n" %(line))
-        # capacity
-        if size(self.u) != 0:
-            text_file.write("u\n")
-            line = list(self.u)
-            text_file.write("%s\n" %(line))
-        # flow
-        if size(self.f) != 0:
-            text_file.write("f\n")
-            line = list(self.f)
-            text_file.write("%s\n" %(line))
-        # coordinates
-        text_file.write("\n# coordinates for draw\n")
-        if size(self.coord) != 0:
-            text_file.write("x\n")
-            coord = array(self.coord.T)
-            line = list(coord[0,:])
-            text_file.write("%s\n" %(line))
-            line = list(coord[1,:])
-            text_file.write("%s\n" %(line))
-        
-        # close the file
+            savetxt(text_file, column_stack((ids[tails - 1], ids[heads - 1],
+                    self.c)), fmt='%d\t%d\t%.17g')
+        else:
+            savetxt(text_file, column_stack((ids[tails - 1],
+                    ids[heads - 1])), fmt='%d\t%d')
         text_file.close()
         
         return self
@@ -932,24 +2290,123 @@ class Graph(object):
         @rtype: number
         @return: position of (i, j)
         """
+        pos = self._find_arc(i, j)
         
-        # check if node i has outgoing arcs
-        if self.N[i-1,0] >= 0:
-            pos = self.N[i-1,0]     # initial position of data for node i
-        else:
+        # check if arc (i,j) exists
+        if pos == -1:
             print 'Arc (%d, %d) does not exist' % (i, j)
             return []
         
-        # check if arc (i,j) exists
-        while self.A[pos,1] != j:
-            pos = self.A[pos,2]     # search next arc in the list of node i
+        return self._arc_pos(pos)
+    
+    def get_arcs_pos(self, I, J):
+        """
+        get the positions of arcs (I[k], J[k]) in the Adjacency matrix, all
+        at once: the arcs are looked for in the arcs sorted by tail and head
+        (kept until the graph changes)
+        
+        @type I: number vector
+        @param I: nodes at the tail of the arcs
+        
+        @type J: number vector
+        @param J: nodes at the head of the arcs
+        
+        @rtype: number vector
+        @return: position of each arc (-1 if it does not exist, the first
+                 position if it has parallel arcs)
+        """
+        I = ravel(I)
+        J = ravel(J)
+        self.compact()              # positions skip deleted arcs
+        
+        # with the arc index, each arc is found in constant time
+        if self._arc_index is not None:
+            pos = empty(size(I), int)
+            for k in range(size(I)):
+                pos[k] = self._find_arc(I[k], J[k])
+            return pos
+        
+        # key of each arc, in the order of the out star (parallel arcs in
+        # order of position)
+        n = self.nodes()
+        key = ('A', 'arc_keys')
+        if key not in self._memo:
+            offsets, arcs = self.build_out_star()
+            tails, heads = self._arc_ends()
+            self._memo[key] = (tails * (n + 1) + heads)[arcs]
+        keys = self._memo[key]
+        offsets, arcs = self.build_out_star()
+        
+        # look for the key of each arc (I[k], J[k])
+        valid = (I >= 1) & (I <= n) & (J >= 1) & (J <= n)
+        wanted = array(where(valid, I, 0), int) * (n + 1) + array(where(valid, J, 0), int)
+        index = minimum(searchsorted(keys, wanted), size(keys) - 1)
+        pos = -1 * ones(size(I), int)
+        if size(keys) != 0:
+            found = valid & (keys[index] == wanted)
+            pos[found] = arcs[index[found]]
+        
+        return pos
+    
+    def has_arc(self, i, j):
+        """
+        check if arc (i, j) exists
+        
+        @type i: number
+        @param i: node at the tail of the arc
+        
+        @type j: number
+        @param j: node at the head of the arc
+        
+        @rtype: boolean
+        @return: true if the arc exists
+        """
+        return self._find_arc(i, j) != -1
+    
+    def _find_arc(self, i, j):
+        """
+        position in the buffers of arc (i, j), using the arc index if it is
+        set, or going over the out-arcs of i otherwise (deleted arcs are not
+        linked, so the buffers are not compacted)
+        
+        @rtype: number
+        @return: position of (i, j) in the buffers (-1 if it does not exist)
+        """
+        if self._arc_index is not None:
+            if not self._arc_index_ok:
+                self._build_arc_index()
+            return self._arc_index.get((i, j), -1)
+        
+        # check if node i has outgoing arcs
+        N = self._view['N']
+        A = self._view['A']
+        if not 0 < i <= shape(N)[0] or N[i-1,0] < 0:
+            return -1
+        pos = N[i-1,0]              # initial position of data for node i
+        
+        # search (i, j) in the list of node i
+        while A[pos,1] != j:
+            pos = A[pos,2]
             # if no arcs are left, indicate it
             if pos == 0:
-                print 'Arc (%d, %d) does not exist' % (i, j)
-                return []
+                return -1
         
         return pos
     
+    def _build_arc_index(self):
+        """
+        build the index of arcs, keeping the first position of parallel arcs
+        """
+        m = self.arcs()
+        if m == 0:
+            self._arc_index = {}
+        else:
+            tails = self.A[::-1,0].tolist()
+            heads = self.A[::-1,1].tolist()
+            # going backwards, the first arc (i, j) in the list of i is kept
+            self._arc_index = dict(zip(zip(tails, heads), range(m - 1, -1, -1)))
+        self._arc_index_ok = True
+    
     def get_out_arcs_pos(self, i):
         """
         get the positions of all outward arcs of node i
@@ -990,19 +2447,19 @@ class Graph(object):
         @rtype: list
         @return: positions of inward arcs
         """
-        # number of arcs
-        m = self.arcs()
+        # rebuild the reverse star if A or N were replaced directly
+        self._update_reverse_star()
         
         # initialize the list
-        list = empty(0, int)
+        list = []
         
-        # check all arcs
-        for arc in range(m):
-            # if the head of the arc is i, add it
-            if self.A[arc,1] == i:
-                list = append(list, arc)
+        # follow the in-arc links of node i
+        pos = self.N_in[i-1,0]
+        while pos != -1:
+            list.append(pos)        # add position to the list
+            pos = self.in_link[pos] # next in-arc of i
         
-        return list
+        return array(list, int)
     
     def get_adjacent_arcs_pos(self, i):
         """
@@ -1014,18 +2471,10 @@ class Graph(object):
         @rtype: list
         @return: positions of adjacent arcs
         """
-        # number of arcs
-        m = self.arcs()
-        
-        # initialize the list
-        list = empty(0, int)
+        # join out-arcs and in-arcs (loops appear only once)
+        list = unique(append(self.get_out_arcs_pos(i), self.get_in_arcs_pos(i)))
         
-        # check all arcs and add the positions if they contain i
-        for arc in range(m):
-            if self.A[arc,0] == i or self.A[arc,1] == i:
-                list = append(list, arc)    # add position to the list
-                
-        return list
+        return array(list, int)
     
     def get_cut_arcs_pos(self, S):
         """
@@ -1035,44 +2484,96 @@ class Graph(object):
         @param S: cut (set of nodes in one side of the cut)
         
         @rtype: list
-        @return: position of arcs in the cut S
-        """
-        positions = empty(0, int)
-        
-        # check each node in S
-        for i in S:
-            # get all out arcs from node i
-            out_arcs = self.get_out_arcs_pos(i)
-            # clean those connected to nodes in S
-            index = 0
-            for k in range(size(out_arcs)):
-                arc = out_arcs[index]
-                j = self.A[arc,1]       # head of the arc
-                # if the head is in S, delete it
-                if sum(S == j) > 0:
-                    out_arcs = delete(out_arcs, index)
-                else:
-                    index += 1
-            
-            # get all in arcs to node i
-            in_arcs = self.get_in_arcs_pos(i)
-            # clean those connected to nodes in S
-            index = 0
-            for k in range(size(in_arcs)):
-                arc = in_arcs[index]
-                j = self.A[arc,0]       # tail of the arc
-                # if the tail is in S, delete it
-                if sum(S==j) > 0:
-                    in_arcs = delete(in_arcs, index)
-                else:
-                    index += 1
-            
-            # paste both lists together
-            positions = append(positions, out_arcs)
-            positions = append(positions, in_arcs)
+        @return: position of arcs in the cut S (for each node of S, its
+                 out-arcs and then its in-arcs)
+        """
+        S = array(S, int).ravel()
+        in_S = self._node_mask(S)
+        
+        # arcs leaving and entering S
+        tails, heads = self._arc_ends()
+        out_arcs = flatnonzero(in_S[tails - 1] & ~in_S[heads - 1])
+        in_arcs = flatnonzero(~in_S[tails - 1] & in_S[heads - 1])
+        positions = append(out_arcs, in_arcs)
+        
+        # place of the end of each arc in S
+        rank = zeros(self.nodes(), int)
+        rank[S[::-1] - 1] = arange(size(S) - 1, -1, -1)
+        ends = append(tails[out_arcs], heads[in_arcs])
+        outward = append(zeros(size(out_arcs), int), ones(size(in_arcs), int))
+        
+        # sort them by node in S, out-arcs first, and position
+        positions = positions[lexsort((positions, outward, rank[ends - 1]))]
             
         return positions
     
+    def get_cut_mask(self, S):
+        """
+        get the arcs in a cut S as a mask, to be updated with add_to_cut()
+        as nodes move into S
+        
+        @type S: vector
+        @param S: cut (set of nodes in one side of the cut)
+        
+        @rtype: tuple
+        @return: (true for the arcs in the cut, true for the nodes in S)
+        """
+        in_S = self._node_mask(S)
+        
+        # arcs with only one end in S
+        tails, heads = self._arc_ends()
+        cut = in_S[tails - 1] != in_S[heads - 1]
+        
+        return cut, in_S
+    
+    def add_to_cut(self, cut, in_S, k):
+        """
+        move node k into S, updating the masks of get_cut_mask() in place
+        in O(degree of k)
+        
+        @type cut: boolean vector
+        @param cut: true for the arcs in the cut
+        
+        @type in_S: boolean vector
+        @param in_S: true for the nodes in S
+        
+        @type k: number
+        @param k: node added to S
+        """
+        in_S[k-1] = True
+        
+        # only the arcs of k change, they are in the cut if the other end is not in S
+        arcs = self.get_adjacent_arcs_pos(k)
+        tails = array(self.A[arcs,0], int).ravel()
+        heads = array(self.A[arcs,1], int).ravel()
+        cut[arcs] = in_S[tails - 1] != in_S[heads - 1]
+    
+    def _arc_ends(self):
+        """
+        tails and heads of all the arcs
+        
+        @rtype: tuple
+        @return: (tail of each arc, head of each arc) as int vectors
+        """
+        A = self.A
+        
+        return array(A[:,0], int).ravel(), array(A[:,1], int).ravel()
+    
+    def _node_mask(self, S):
+        """
+        membership vector of a set of nodes
+        
+        @type S: vector
+        @param S: set of nodes
+        
+        @rtype: boolean vector
+        @return: vector with true for the nodes in S
+        """
+        mask = zeros(self.nodes(), bool)
+        mask[array(S, int).ravel() - 1] = True
+        
+        return mask
+    
     def get_adjacent_nodes(self, i):
         """
         get all the adjacent nodes of node i
@@ -1083,28 +2584,20 @@ class Graph(object):
         @rtype: list
         @return: list of adjacent nodes
         """
-        # number of arcs
-        m = self.arcs()
+        # adjacent arcs, in ascending position
+        arcs = self.get_adjacent_arcs_pos(i)
+        if size(arcs) == 0:
+            return empty(0, int)
         
-        # initialize the list
-        list = empty(0, int)
+        # the other end-point of each arc
+        tails = array(self.A[arcs,0], int).ravel()
+        heads = array(self.A[arcs,1], int).ravel()
+        list = where(tails == i, heads, tails)
         
-        # check all arcs and add the positions if they contain i
-        for arc in range(m):
-            # when the tail is in i
-            if self.A[arc,0] == i:
-                j = self.A[arc,1]                   # adjacent node
-                # if j is not on the list, add it
-                if sum(list == j) == 0:
-                    list = append(list, j)  # add node to the list
-            # if the head is in i
-            elif self.A[arc,1] == i:
-                j = self.A[arc,0]                   # adjacent node
-                # if j is not on the list, add it
-                if sum(list == j) == 0:
-                    list = append(list, j)  # add node to the list
-                
-        return list
+        # keep the first appearance of each node
+        dummy, first = unique(list, return_index=True)
+        
+        return list[sort(first)]
     
     def get_arc_data(self, i, j):
         """
@@ -1150,39 +2643,63 @@ class Graph(object):
     
     def build_adjacency_lists(self):
         """
-        build a list of adjacency nodes for each node
+        build the list of adjacent nodes of each node (ignoring the direction
+        of the arcs), kept in the graph until it changes
+        
+        @note: the adjacent nodes of node i are index[offsets[i-1]:offsets[i]],
+               in ascending order and without repetitions
         
-        @rtype: list of lists
-        @return: list of adjacency nodes for each node
+        @rtype: tuple
+        @return: (offsets, index), as read-only int vectors
         """
-        # number of arcs
-        m = self.arcs()
+        if self._adjacency is not None:
+            return self._adjacency
+        
         # number of nodes
         n = self.nodes()
         
-        # initialize the matrix
-        adj_matrix = zeros((n,n), int)
+        # both directions of each arc, sorted and without repetitions
+        tails, heads = self._arc_ends()
+        pairs = unique(append(tails * (n + 1) + heads, heads * (n + 1) + tails))
+        nodes = pairs // (n + 1)
+        index = pairs % (n + 1)
+        
+        # start of the list of each node
+        offsets = zeros(n + 1, int)
+        offsets[1:] = cumsum(bincount(nodes - 1, minlength=n))
+        
+        offsets.flags.writeable = False
+        index.flags.writeable = False
+        self._adjacency = (offsets, index)
+        
+        return self._adjacency
+    
+    def build_out_star(self):
+        """
+        build the list of out-arcs of each node, in order of their heads
+        (parallel arcs in order of position), kept in the graph until it
+        changes, so the arcs can be used sorted without sorting the graph
+        
+        @note: the out-arcs of node i are arcs[offsets[i-1]:offsets[i]]
         
-        # check all arcs and add the positions if they contain i
-        for arc in range(m):
-            i = self.A[arc,0]       # get edge elements
-            j = self.A[arc,1]
-            # indicate adjacency
-            adj_matrix[i-1,j-1] = 1
-            adj_matrix[j-1,i-1] = 1
+        @rtype: tuple
+        @return: (offsets, arcs), as read-only int vectors
+        """
+        key = ('A', 'out_star')
+        if key not in self._memo:
+            tails, heads = self._arc_ends()
+            if self._sorted:
+                arcs = arange(size(tails))
+            else:
+                arcs = lexsort((heads, tails))
+            offsets = zeros(self.nodes() + 1, int)
+            offsets[1:] = cumsum(self.degrees()[0])
             
-        # build lists
-        list = []
-        for n_i in range(n):
-            # build adjacency vector for node n_i+1
-            list_i = empty(0, int)
-            for n_j in range(n):
-                if adj_matrix[n_i,n_j] == 1:
-                    list_i = append(list_i, n_j+1)
-            # add this list to the master list
-            list.append(list_i)
+            offsets.flags.writeable = False
+            arcs.flags.writeable = False
+            self._memo[key] = (offsets, arcs)
         
-        return list
+        return self._memo[key]
     
     """
     Functions for Checking Properties
@@ -1214,19 +2731,59 @@ class Graph(object):
         if not self.is_correct_type('d'):
             return False
         
-        # number of arcs
-        m = self.arcs()
+        # if a tail is larger than its head, it is not in order
+        key = ('A', 'top_sort')
+        if key not in self._memo:
+            tails, heads = self._arc_ends()
+            self._memo[key] = not any(tails > heads)
+            
+        return self._memo[key]
+    
+    def is_connected(self):
+        """
+        checks if all nodes are reachable from node 1, considering that
+        all arcs are undirected
         
-        # initialize condition
-        cond = True
+        @rtype: boolean
+        @return: true if the graph is connected
+        """
+        key = ('A', 'connected')
+        if key not in self._memo:
+            self._memo[key] = self.nodes() == 0 or all(self.u_reach_from(1))
         
-        for arc in range(m):
-            # if the tail is larger than the head, it is not in order
-            if self.A[arc,0] > self.A[arc,1]:
-                cond = False
-                return cond
-            
-        return cond
+        return self._memo[key]
+    
+    def degrees(self):
+        """
+        out-degree and in-degree of each node
+        
+        @rtype: tuple
+        @return: (out-degrees, in-degrees), read only
+        """
+        key = ('A', 'degrees')
+        if key not in self._memo:
+            n = self.nodes()
+            tails, heads = self._arc_ends()
+            out_degree = bincount(tails - 1, minlength=n)
+            in_degree = bincount(heads - 1, minlength=n)
+            out_degree.flags.writeable = False
+            in_degree.flags.writeable = False
+            self._memo[key] = (out_degree, in_degree)
+        
+        return self._memo[key]
+    
+    def has_negative_cost(self):
+        """
+        checks if any arc has a negative cost
+        
+        @rtype: boolean
+        @return: true if a cost is negative
+        """
+        key = ('c', 'negative')
+        if key not in self._memo:
+            self._memo[key] = size(self.c) != 0 and self.c.min() < 0
+        
+        return self._memo[key]
         
     def is_coloring(self, C):
         """
@@ -1240,20 +2797,9 @@ class Graph(object):
         """
         C = array(C, int)
         
-        # number of arcs
-        m = self.arcs()
-        
-        # initialize condition
-        cond = True
-        
-        for arc in range(m):
-            i = self.A[arc,0]        # arc end-points
-            j = self.A[arc,1]
-            
-            # if head and tail have the same color, stop
-            if C[i-1] == C[j-1]:
-                cond = False
-                return cond
+        # if a head and its tail have the same color, it is not a coloring
+        tails, heads = self._arc_ends()
+        cond = not any(C[tails - 1] == C[heads - 1])
         
         return cond
     
@@ -1268,26 +2814,34 @@ class Graph(object):
         @rtype: binary vector
         @return: vector with 1 for those nodes that are reachable
         """
-        # work over H so self is not arc-sorted
-        H = self.copy()
-        # do BFS
-        reach, dummy = breath_first(H, k)
+        # check if it a valid Graph
+        if not self.is_correct_type('dr'):
+            if self.is_correct_type('u'):
+                print 'ERROR: the graph is undirected, use u_reach_from()'
+            else:
+                print 'ERROR: the graph is not directed'
+            return []
         
-        # number of nodes
-        n = self.nodes()
+        key = ('u', 'reach', int(k))
+        if key in self._memo:
+            return self._memo[key]
         
-        for i in range(n):          # set as 1 all those that have an order
-            if reach[i] != inf:
-                reach[i] = 1
-            else:
-                reach[i] = 0
+        # do BFS (the graph is not changed)
+        reach, dummy = breath_first_levels(self, k)
+        if size(reach) == 0:
+            return reach            # the search was not possible
+        
+        # set as 1 all those that have an order
+        reach = (reach != inf) * 1.0
+        reach.flags.writeable = False
+        self._memo[key] = reach
         
         return reach
     
     def u_reach_from(self, k):
         """
-        checks which nodes are reachable from k using BFS,
-        considering that all arcs are undirected
+        checks which nodes are reachable from k, considering that all arcs
+        are undirected
         
         @type k: number
         @param k: node from which to check
@@ -1295,36 +2849,35 @@ class Graph(object):
         @rtype: binary vector
         @return: vector with 1 for those nodes that are reachable
         """
-        # number of nodes
-        n = self.nodes()
+        key = ('A', 'u_reach', int(k))
+        if key in self._memo:
+            return self._memo[key]
         
-        # reachable vector
-        reach = zeros(n)
-        # testing list
-        list = array([k])
+        # adjacent nodes of each node
+        offsets, index = self.build_adjacency_lists()
         
-        while size(list) > 0:
-            i = list[0]             # get first node
-            list = delete(list, 0)  # eliminate it from the list
-            
-            # check all the out-arcs to add the adjacent nodes
-            out_list = self.get_out_arcs_pos(i)
-            for arc in out_list:
-                j = self.A[arc,1]   # head of the arc
-                # if it was not labeled, label it and add it to the testing list
-                if reach[j-1] == 0:
-                    reach[j-1] = 1
-                    list = append(list, j)
+        # reachable vector
+        reach = zeros(self.nodes())
+        reach[k-1] = 1
+        level = array([k])          # nodes of the current level
+        
+        # keep on searching while the level has nodes
+        while size(level) != 0:
+            # adjacent nodes of the nodes of the level
+            starts = offsets[level - 1]
+            counts = offsets[level] - starts
+            ends = cumsum(counts)
+            if ends[-1] == 0:
+                break
+            adjacent = index[arange(ends[-1]) + repeat(starts - ends + counts, counts)]
             
-            # check all the in-arcs to add the adjacent nodes
-            in_list = self.get_in_arcs_pos(i)
-            for arc in in_list:
-                j = self.A[arc,0]   # tail of the arc
-                # if it was not labeled, label it and add it to the testing list
-                if reach[j-1] == 0:
-                    reach[j-1] = 1
-                    list = append(list, j)
-                
+            # the nodes that were not labeled form the next level
+            level = unique(adjacent[reach[adjacent - 1] == 0])
+            reach[level - 1] = 1
+        
+        reach.flags.writeable = False
+        self._memo[key] = reach
+        
         return reach
     
     """
@@ -1345,17 +2898,18 @@ class Graph(object):
             print "ERROR: the graph has no cost vector"
             return 0
         
-        n = self.nodes()        # number of nodes in the tree
-        total_cost = 0          # initialization
+        T = ravel(T)
+        # arcs from the predecessor of each node, if it exists
+        heads = flatnonzero((T != 0) & (T != inf)) + 1
+        arcs = self.get_arcs_pos(T[heads - 1], heads)
+        
+        # check that all the arcs exist
+        if any(arcs == -1):
+            print "ERROR: the tree uses arcs that are not in the graph"
+            return 0
         
         # sum up all the arcs in the tree
-        for node in range(n):
-            j = node + 1        # head of the arc
-            i = T[node]         # tail of the arc
-            # if a predecessor exist, add the arc
-            if i != 0 and i != inf:
-                arc = self.get_arc_data(i, j)
-                total_cost += arc[3]
+        total_cost = sum(self.c[arcs])
         
         return total_cost
     
@@ -1374,16 +2928,17 @@ class Graph(object):
             print "ERROR: the graph has no cost vector"
             return 0
         
-        n = size(P)             # number of nodes in the tree
-        total_cost = 0          # initialization
+        P = ravel(P)
+        # arcs between consecutive nodes of the path
+        arcs = self.get_arcs_pos(P[:-1], P[1:])
         
-        # sum up all the arcs in the tree
-        for node in range(n - 1):
-            i = P[node]         # head of the arc
-            j = P[node + 1]     # tail of the arc
-            # get the arc and sum it's cost
-            arc = self.get_arc_data(i, j)
-            total_cost += arc[3]
+        # check that all the arcs exist
+        if any(arcs == -1):
+            print "ERROR: the path uses arcs that are not in the graph"
+            return 0
+        
+        # sum up all the arcs in the path
+        total_cost = sum(self.c[arcs])
                 
         return total_cost
     
@@ -1402,13 +2957,10 @@ class Graph(object):
             print "ERROR: the graph has no cost vector"
             return 0
         
-        # initialization
-        total_cost = 0
         set = array(set, int)
         
         # sum up all the arcs in the set
-        for arc in set:
-            total_cost += self.c[arc]
+        total_cost = sum(self.c[set])
         
         return total_cost
     
@@ -1423,14 +2975,8 @@ class Graph(object):
             print "ERROR: the graph has no cost or flow vectors"
             return 0
         
-        # number of arcs
-        m = self.arcs()
-        # initialization
-        total_cost = 0
-        
         # sum up the flow costs
-        for arc in range(m):
-            total_cost += self.c[arc] * self.f[arc]
+        total_cost = dot(self.c, self.f)
         
         return total_cost
     
@@ -1448,19 +2994,9 @@ class Graph(object):
             print "ERROR: no flow vector in this graph"
             return 0
         
-        # initialization
-        flow = 0
-        
-        # get all out arcs from s
-        out_arcs = self.get_out_arcs_pos(s)
-        # sum up their flows
-        for arc in out_arcs:
-            flow += self.f[arc]
-        
-        in_arcs = self.get_in_arcs_pos(s)
-        # subtract up their flows
-        for arc in in_arcs:
-            flow -= self.f[arc]
+        # sum up the flows of the out arcs and subtract those of the in arcs
+        tails, heads = self._arc_ends()
+        flow = sum(self.f[tails == s]) - sum(self.f[heads == s])
             
         return flow
     
@@ -1478,19 +3014,10 @@ class Graph(object):
             print "ERROR: no capacity vector in this graph"
             return 0
         
-        # initialization
-        capacity = 0
-        
-        # check the capacity of each node in S
-        for i in S:
-            # get all out arcs from node
-            out_arcs = self.get_out_arcs_pos(i)
-            # sum up their flows if the head is not in S
-            for arc in out_arcs:
-                j = self.A[arc,1]       # head of the arc
-                # if the head is not in S, add the capacity
-                if sum(S == j) == 0:
-                    capacity += self.u[arc]
+        # sum up the capacity of the arcs from S to nodes outside S
+        in_S = self._node_mask(S)
+        tails, heads = self._arc_ends()
+        capacity = sum(self.u[in_S[tails - 1] & ~in_S[heads - 1]])
         
         return capacity
             
@@ -1510,57 +3037,46 @@ class Graph(object):
             print "ERROR: the graph has no capacities set"
             return self
         
+        # number of arcs
+        m = self.arcs()
+        
+        # flow of the arcs
+        if size(self.f) == 0:
+            print 'Warning: the graph does not contain a flow vector, a zero vector was added'
+            f = zeros(m)
+        else:
+            f = ravel(self.f)
+        
         # residual graph definition and initialization
         R = Graph()
+        R._dtype = self._dtype
         R.type = "r"
-        R.A = self.A.copy()
         R.N = self.N.copy()
         R.B = self.B.copy()
         R.source = self.source
         R.sink = self.sink
         if size(self.coord) != 0:
             R.coord = self.coord.copy()
-         
-        # number of arcs
-        m = self.arcs()
-        # add capacities
-        R.u = zeros(m)
-        R.u[0:m] = self.u.copy()
-        # add flow
-        R.f = zeros(m)
-        # check if a flow exists
-        if size(self.f) == 0:
-            print 'Warning: the graph does not contain a flow vector, a zero vector was added'
-        else:
-            R.f = self.f
         
-        # add costs
+        # the reverse of arc is added in position m + arc
+        A = zeros((2 * m, 3), int)
+        A[:m,0:2] = self.A[:,0:2]
+        A[m:,0] = A[:m,1]
+        A[m:,1] = A[:m,0]
+        R.A = A
+        R.build_forward_star()
+        R.build_reverse_star()
+        R.set_arc_index(True)       # arcs are searched by the algorithms
+        
+        # mirror links
+        R.mirror = append(arange(m, 2 * m), arange(m))
+        # cap of arc = cap - flow, cap of residual arc = flow
+        R.u = array(append(ravel(self.u) - f, f), float)
+        # indicate forward and backward arcs
+        R.f = append(ones(m), -ones(m))
+        # set costs if they exist
         if size(self.c) != 0:
-            R.c = zeros(m)
-            R.c[0:m] = self.c.copy()
-        
-        # mirror vector
-        R.mirror = zeros(m, int)
-        
-        # add the reverse arc
-        for arc in range(m):
-            # get arc nodes
-            i = self.A[arc,0]
-            j = self.A[arc,1]
-            
-            # build reverse arc
-            R = R.add_arc(j, i)
-            # mirror links
-            R.mirror[arc] = m + arc
-            R.mirror[m + arc] = arc
-            # set capacities
-            R.u[m + arc] = R.f[arc]         # cap of residual arc = flow
-            R.u[arc] = R.u[arc] - R.f[arc]  # cap of arc = cap - flow
-            R.f[arc] = 1                    # indicate forward arc
-            R.f[m + arc] = -1               # indicate backward arc
-            # set costs if they exist
-            if size(R.c) != 0:
-                R.c[m + arc] = -R.c[arc]
+            R.c = array(append(ravel(self.c), -ravel(self.c)), float)
         
         return R
     
@@ -1579,42 +3095,41 @@ class Graph(object):
             print "ERROR: the residual graph has no capacities set"
             return self
         
-        # graph definition and initialization
+        # backward arcs and their forward arcs
+        back = ravel(self.f) == -1
+        forward = logical_not(back)
+        link = ravel(self.mirror)[back]
+        
+        # the flow of a forward arc is the capacity of its backward arc, and
+        # its capacity is the sum of both
+        f = array(self.f)
+        u = array(self.u)
+        f[link] = u[back]
+        add.at(u, link, u[back])
+        
+        # graph definition and initialization, without the backward arcs
         G = Graph()
+        G._dtype = self._dtype
         G.type = "d"
-        G.A = self.A.copy()
         G.N = self.N.copy()
+        G.A = self.A[forward]
+        G.build_forward_star()
+        G.build_reverse_star()
         G.source = self.source
         G.sink = self.sink
         if size(self.coord) != 0:
             G.coord = self.coord.copy()
         
-        m = self.arcs()                     # number of arcs for G
         # add capacities
-        G.u = self.u.copy()
+        G.u = u[forward]
         # add flow
-        G.f = self.f.copy()
+        G.f = f[forward]
         # add costs
-        G.c = self.c.copy()
+        if size(self.c) != 0:
+            G.c = self.c[forward]
         # add external flow
         G.B = self.B.copy()
         
-        # go over the arcs and correct the capacity and flow
-        for arc in range(m):
-            if self.f[arc] == -1:
-                link = self.mirror[arc]     # link to forward arc
-                G.f[link] = G.u[arc]
-                G.u[link] = G.u[link] + G.u[arc]
-                
-        # eliminate the backwards arcs
-        pos = 0
-        for arc in range(m):
-            # if it is a residual arc, eliminate it
-            if self.f[arc] == -1:
-                G = G.del_arc_pos(pos)
-            else:
-                pos += 1
-        
         return G
     
     """
@@ -1629,10 +3144,14 @@ class Graph(object):
         """
         # new graph
         H = Graph()
+        H._dtype = self._dtype
         
         # copy structures
         H.A = self.A.copy()
         H.N = self.N.copy()
+        H.N_in = self.N_in.copy()
+        H.in_link = self.in_link.copy()
+        H._reverse_ok = self._reverse_ok
         H.B = self.B.copy()
         H.coord = self.coord.copy()
         
@@ -1646,8 +3165,107 @@ class Graph(object):
         H.sink = self.sink
         H.names = self.names
         
+        # use the arc index in the copy too
+        if self._arc_index is not None:
+            H.set_arc_index(True)
+        H._sorted = self._sorted
+        
+        return H
+    
+    def memory_usage(self):
+        """
+        memory used by the arrays of the graph, including the spare rows
+        of their buffers
+        
+        @rtype: dictionary
+        @return: bytes used by each array, and by all of them in 'total'
+        """
+        usage = {}
+        for name in self._buffer:
+            usage[name] = self._buffer[name].nbytes
+        usage['total'] = sum(usage.values())
+        
+        return usage
+    
+    def view(self):
+        """
+        make a read-only view of the graph, sharing its arrays instead of
+        copying them (an array is copied only when the view or the graph
+        changes it, so neither is changed through the other)
+        
+        @rtype: graph
+        @return: view of the graph
+        """
+        # remove deleted arcs, so the view does not share them
+        self.compact()
+        
+        # new graph
+        H = Graph()
+        H._dtype = self._dtype
+        
+        # share structures, without allowing changes in place in any of
+        # them (both copy them before changing them)
+        for name in self._view:
+            shared = self._view[name].view()
+            shared.flags.writeable = False
+            H._store(name, shared)
+            self._store(name, shared)
+        H._reverse_ok = self._reverse_ok
+        
+        H.type = self.type
+        H.source = self.source
+        H.sink = self.sink
+        H.names = self.names
+        
+        # the view builds its own arc index
+        if self._arc_index is not None:
+            H.set_arc_index(True)
+        H._sorted = self._sorted
+        
         return H
     
+    def sort_arcs(self, type="ascending"):
+        """
+        sort the arcs by tail and then by head (parallel arcs keep their
+        order), moving their data with them
+        
+        @note: sorting in ascending order a graph that is already sorted
+               takes no time
+        
+        @type type: string
+        @param type: sorting order (ascending or descending)
+        
+        @rtype: graph
+        @return: sorted graph
+        """
+        if type == "ascending" and self._sorted:
+            return self
+        
+        # new order of the arcs
+        tails, heads = self._arc_ends()
+        if type == "ascending":
+            order = lexsort((heads, tails))
+        else:
+            order = lexsort((-heads, -tails))
+        
+        # move the arcs and their data
+        self.A = self.A[order]
+        for name in ['c', 'u', 'f']:
+            if size(self._view[name]) != 0:
+                self._store(name, self._view[name][order], True)
+        # mirror links go to the new positions
+        if size(self.mirror) != 0:
+            new_pos = empty(size(order), int)
+            new_pos[order] = arange(size(order))
+            self.mirror = new_pos[array(self.mirror[order], int)]
+        
+        # link the arcs in their new order
+        self.build_forward_star()
+        self.build_reverse_star()
+        self._sorted = type == "ascending"
+        
+        return self
+    
     def swap_arc(self, pos):
         """
         swap arc in position pos from (i, j) to (j, i)
@@ -1681,12 +3299,12 @@ class Graph(object):
         
         # add data to it
         if size(self.c) != 0:
-            self.c[m-1] = c
+            self.get_writable('c')[m-1] = c
         if size(self.u) != 0:
-            self.u[m-1] = u
+            self.get_writable('u')[m-1] = u
         if size(self.f) != 0:
-            self.f[m-1] = f
+            self.get_writable('f')[m-1] = f
         if size(self.mirror) != 0:
-            self.mirror[m-1] = mirror
+            self.get_writable('mirror')[m-1] = mirror
             
         return self
\ No newline at end of file
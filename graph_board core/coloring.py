@@ -408,8 +408,8 @@ def tabu_precoloring_search(*args):
     G = args[0]
     n = G.nodes()
     
-    # get full adjacency matrix for speeding the process
-    adj_matrix = G.build_adjacency_lists()
+    # get the adjacency lists for speeding the process
+    offsets, index = G.build_adjacency_lists()
     
     # load tabu parameters
     params = args[1]                # tabu parameters
@@ -438,7 +438,7 @@ def tabu_precoloring_search(*args):
             # if belongs to O, check all colors
             if C[node] == 0:
                 # get list of adjacent nodes
-                adjacent_list = adj_matrix[node]
+                adjacent_list = index[offsets[node]:offsets[node + 1]]
                 # get respective colors
                 color_list = C[adjacent_list - 1]
                 #print "node: ", node + 1
@@ -479,7 +479,7 @@ def tabu_precoloring_search(*args):
             # add color to best node
             C[best_node] = best_color
             # get adjacent nodes
-            adjacent_list = adjacent_list = adj_matrix[best_node]
+            adjacent_list = index[offsets[best_node]:offsets[best_node + 1]]
             # put in O all nodes in the list with best_color, and tabu them
             for j in adjacent_list:
                 if C[j-1] == best_color:
@@ -505,7 +505,7 @@ class GraphBoard:
             x_pos = uniform(self.node_size, self.c_size[0] - self.node_size)
             y_pos = uniform(self.node_size, self.c_size[1] - self.node_size)
             # add coordinates to coord vector
-            self.graph.coord[node] = array([x_pos, y_pos], float)
+            self.graph.get_writable('coord')[node] = array([x_pos, y_pos], float)
         
         # make sure that the coord matrix is a float
         self.graph.coord = matrix(self.graph.coord, float)
@@ -684,7 +684,7 @@ class GraphBoard:
         # ask for the flow
         flow = float(raw_input("external in-flow: \n"))
         # add the flow to the graph
-        self.graph.B[i-1] = flow
+        self.graph.get_writable('B')[i-1] = flow
         # update the drawing
         self.canvas.itemconfigure("enode_%d" %(i), text=flow)
         
@@ -745,7 +745,7 @@ class GraphBoard:
         # mouse click coordinates
         x_pos, y_pos = event.x, event.y
         # add coordinates to coord vector
-        self.graph.coord[n-1,:] = array([x_pos, y_pos])
+        self.graph.get_writable('coord')[n-1,:] = array([x_pos, y_pos])
         
         # circle coordinates
         x_1 = x_pos - self.node_size
@@ -1090,7 +1090,7 @@ class GraphBoard:
         y_1 = self.graph.coord[i-1,1] + dy
         
         # update in cord matrix
-        self.graph.coord[i-1,:] = array([x_1, y_1])
+        self.graph.get_writable('coord')[i-1,:] = array([x_1, y_1])
         
         # move node
         self.sel_obj = self.canvas.find_withtag("node_%d" %(i)) # get the node
@@ -1326,7 +1326,7 @@ class GraphBoard:
                     # in calculation mode only update the matrix
                     x = self.graph.coord[i_node,0] + dx
                     y = self.graph.coord[i_node,1] + dy
-                    self.graph.coord[i_node,:] = array([x, y])
+                    self.graph.get_writable('coord')[i_node,:] = array([x, y])
                 
             self.master.update_idletasks()
             
@@ -1445,20 +1445,17 @@ class GraphBoard:
         """
         # number of nodes
         n = self.graph.nodes()
+        T = ravel(T)
         
         root = []
-        # draw arcs
-        for node in range(n):
-            i = T[node]              # tail of arc
-            if i == 0:
-                root = node + 1
-            elif i == inf:           # non connected nodes
-                pass
-            else:
-                i = i                # tail of the arc
-                j = node + 1         # head of arc
-                pos = self.graph.get_arc_pos(i, j)
-                # change arc line color
+        if any(T[:n] == 0):
+            root = flatnonzero(T[:n] == 0)[-1] + 1
+        
+        # draw arcs from the predecessor of each node (non connected nodes have inf)
+        heads = flatnonzero((T[:n] != 0) & (T[:n] != inf)) + 1
+        for pos in self.graph.get_arcs_pos(T[heads - 1], heads):
+            # change arc line color
+            if pos != -1:
                 self.canvas.itemconfigure("arc_%d" %(pos), fill="red")
         # change root color
         if root != []:
@@ -1479,13 +1476,11 @@ class GraphBoard:
         p = size(P)
         
         # draw arcs
-        i = P[0]                     # initialize tail
-        for k in range(1, p):
-            j = P[k]                 # head of arc
-            pos = self.graph.get_arc_pos(i, j)
+        P = ravel(P)
+        for pos in self.graph.get_arcs_pos(P[:-1], P[1:]):
             # change arc line color
-            self.canvas.itemconfigure("arc_%d" %(pos), fill="red")
-            i = j
+            if pos != -1:
+                self.canvas.itemconfigure("arc_%d" %(pos), fill="red")
         
         # change start/end color
         self.canvas.itemconfigure("node_%d" %(P[0]), outline="red")
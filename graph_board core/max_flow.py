@@ -88,19 +88,20 @@ def generic_augmenting_path(*args):
     R = G.residual_graph()
     
     # augment while an augmenting path exists
-    order, p = breath_first(R, s)   # do a search from s to all nodes
+    order, p, p_arc = breath_first_levels(R, s, True)  # do a search from s to all nodes
     t_reach = p[t-1]
     while t_reach != inf:
-        # get an augmenting path
+        # get an augmenting path, and the arcs it uses
         path = get_rooted_path(p, t)
+        arcs = get_rooted_path_arcs(p, p_arc, t)
         # get maximum capacity
-        delta = path_max_capacity(R, path)
+        delta = path_max_capacity(R, path, arcs)
         print "path: ", path
         print "delta: ", delta
         # augment the flow
-        R = augment_path(R, path, delta)
+        R = augment_path(R, path, delta, arcs)
         # do a new search on the modified graph
-        order, p = breath_first(R, s)
+        order, p, p_arc = breath_first_levels(R, s, True)
         t_reach = p[t-1]
     
     # get the flow from the residual graph
@@ -171,6 +172,7 @@ def labeling_max_flow(*args):
         # un-label all nodes
         label = zeros(n)            # label vector
         pred = zeros(n)             # predecessor list
+        pred_arc = -1 * ones(n, int)    # arc from the predecessor
         
         # label s and add to list
         label[s-1] = 1
@@ -196,19 +198,21 @@ def labeling_max_flow(*args):
                     list = append(list, j)  # add j to the list
                     label[j-1] = 1          # and label it
                     pred[j-1] = i           # predecessor
+                    pred_arc[j-1] = pos     # arc from the predecessor
                 pos = int(R.A[pos,2])       # check next node
                 link = pos
             
         # if t was labeled, augment
         if label[t-1] == 1:
-            # get the path from the predecessor list
+            # get the path from the predecessor list, and the arcs it uses
             path = get_rooted_path(pred, t)
+            arcs = get_rooted_path_arcs(pred, pred_arc, t)
             # get maximum capacity
-            delta = path_max_capacity(R, path)
+            delta = path_max_capacity(R, path, arcs)
             print "path: ", path
             print "delta: ", delta
             # augment the flow
-            R = augment_path(R, path, delta)
+            R = augment_path(R, path, delta, arcs)
     
     # get the flow from the residual graph
     Gf = R.graph_from_residual()
@@ -268,14 +272,15 @@ def cheapest_bottleneck(*args):
         print "Max Flow problem was not solvable"
         return []
     
-    # copy the graph and change costs
-    H = G.copy()
+    # view the graph and change costs (only the costs are copied)
+    H = G.view()
     m = H.arcs()
     
+    cost = H.get_writable('c')
     for arc in range(m):
         # if the arc is not saturated, set cost as 0
         if H.f[arc] < H.u[arc]:
-            H.c[arc] = 0
+            cost[arc] = 0
     
     print "Solving Cheapest Path Problem"
     # solve the shortest path over this new graph
@@ -313,7 +318,35 @@ def get_rooted_path(p, t):
     
     return path
 
-def path_max_capacity(R, path):
+def get_rooted_path_arcs(p, p_arc, t):
+    """
+    get the arcs of the path from the root to a node t, using the
+    predecessor vector and the arc from the predecessor of each node
+    
+    @type p: int vector
+    @param p: predecessor array
+    
+    @type p_arc: int vector
+    @param p_arc: position of the arc from the predecessor of each node
+    
+    @type t: int
+    @param t: destination node to build path root -> t
+    
+    @rtype: int vector
+    @return: positions of the arcs to go from root to t
+    """
+    arcs = []
+    node = t                        # last node
+    
+    # go back to the root
+    while p[node-1] != 0:
+        arcs.append(p_arc[node-1])
+        node = int(p[node-1])
+    arcs.reverse()
+    
+    return array(arcs, int)
+
+def path_max_capacity(R, path, arcs=None):
     """
     get the maximum capacity of a path in the graph
     
@@ -323,28 +356,34 @@ def path_max_capacity(R, path):
     @type path: int vector
     @param path: path to test
     
+    @type arcs: int vector
+    @param arcs: positions of the arcs of the path (optional, needed to
+                 choose among parallel arcs)
+    
     @rtype: float/int
     @return: maximum flow that can be pushed in the path
     """
     # initialize delta
     delta = inf
     steps = size(path) - 1          # number of arcs in the path
-    
-    for node in range(steps):
-        # path arc
-        i = path[node]
-        j = path[node + 1]
-        # get arc information
-        data = R.get_arc_data(i,j)
-        # @todo: add protection if arc does not exist
-        u = data[4]
-        # update max cap
-        if u < delta:
-            delta = u
+    if steps < 1:
+        return delta
+    
+    # get the arcs of the path, if they are not given
+    path = ravel(path)
+    if arcs is None:
+        arcs = R.get_arcs_pos(path[:-1], path[1:])
+    arcs = array(arcs, int)
+    if any(arcs == -1):
+        print 'ERROR: the path uses arcs that are not in the graph'
+        return 0
+    
+    # max cap is the smallest capacity in the path
+    delta = R.u[arcs].min()
             
     return delta
 
-def augment_path(R, path, flow):
+def augment_path(R, path, flow, arcs=None):
     """
     augment an amount flow through a path in R
     
@@ -357,6 +396,10 @@ def augment_path(R, path, flow):
     @type flow: number
     @param flow: flow to push
     
+    @type arcs: int vector
+    @param arcs: positions of the arcs of the path (optional, needed to
+                 choose among parallel arcs)
+    
     @rtype: graph
     @return: graph with flow pushed
     """
@@ -366,24 +409,28 @@ def augment_path(R, path, flow):
         return R
     
     steps = size(path) - 1          # number of arcs in the path
-    for node in range(steps):
-        # path arc
-        i = path[node]
-        j = path[node + 1]
-        arc = R.get_arc_pos(i, j)
+    if steps < 1:
+        return R
+    
+    # get the arcs of the path, if they are not given
+    path = ravel(path)
+    if arcs is None:
+        arcs = R.get_arcs_pos(path[:-1], path[1:])
+    arcs = array(arcs, int)
+    if any(arcs == -1):
+        print 'ERROR: the path uses arcs that are not in the graph'
+        return R
+    
+    # augment the flow in the arcs
+    if R.type == "d":
+        # if it is a directed graph, just increase f
+        add.at(R.get_writable('f'), arcs, flow)
         
-        # augment the flow in the arc
-        if R.type == "d":
-            # if it is a directed graph, just increase f
-            R.f[arc] = R.f[arc] + flow
-            
-        elif R.type == "r":
-            # if it is a residual graph, reduce capacity of arc, and increase of reverse
-            R.u[arc] = R.u[arc] - flow
-            link = R.mirror[arc]    # back arc
-            R.u[link] = R.u[link] + flow
-            #print "pushed ", flow, "through arc (%d,%d)" %(R.A[arc,0], R.A[arc,1])
-            #print "and pushed back through arc (%d,%d)" %(R.A[link,0], R.A[link,1])
+    elif R.type == "r":
+        # if it is a residual graph, reduce capacity of arcs, and increase of reverse
+        u = R.get_writable('u')
+        subtract.at(u, arcs, flow)
+        add.at(u, R.mirror[arcs], flow)
     
     return R
 
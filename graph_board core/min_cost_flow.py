@@ -247,18 +247,18 @@ def feasible_flow(G):
     n = G.nodes()
     m = G.arcs()
     
-    # duplicate G to avoid changes in G
-    H = G.copy()
+    # view G to avoid changes in G (arrays are copied when they change)
+    H = G.view()
     
     # create a virtual source and sink
     H.add_node()                    # add a source node in n+1
     s = n + 1
-    H.coord[s-1,:] = array([40, 560])
+    H.get_writable('coord')[s-1,:] = array([40, 560])
     H.add_node()                    # add a sink node in n+2
     t = n + 2
     H.source = s
     H.sink = t
-    H.coord[t-1,:] = array([40, 40])
+    H.get_writable('coord')[t-1,:] = array([40, 40])
     
     # add arcs: from s (n+1) to each B>0 and from B<0 to t (n+2)
     for node in range(n):
@@ -267,12 +267,12 @@ def feasible_flow(G):
         if b > 0:
             H.add_arc(s, node+1)
             arc = H.get_arc_pos(s, node+1)
-            H.u[arc] = b
+            H.get_writable('u')[arc] = b
         # if it is a sink node
         elif b < 0:
             H.add_arc(node+1, t)
             arc = H.get_arc_pos(node+1, t)
-            H.u[arc] = -b
+            H.get_writable('u')[arc] = -b
             
     # solve a max flow problem from s to t
     H = labeling_max_flow(H, s, t)
@@ -84,7 +84,7 @@ def min_cut_from_mf(*args):
     # get the residual graph
     R = G.residual_graph()
     # find the set of reachable nodes in R
-    order, p = breath_first(R, s)   # do a search from s to all nodes
+    order, p = breath_first_levels(R, s)   # do a search from s to all nodes
     n = size(p)                     # number of nodes
     cut = empty(0, int)
     
@@ -153,19 +153,24 @@ def global_min_cut(*args):
     min_cut_cap = inf           # initialize cut value
     min_flow = empty(0)         # initialize minimum flow
     
+    # work over a view, so the flows set by the solves are not kept in G
+    G = G.view()
+    # nodes that can be reached from s (the others have no flow)
+    reach = G.reach_from(s)
+    
     # do the n, max flow problems
     for node in range(n):
         t = node + 1
-        # solve a max flow problem for each of the other nodes
-        if t != s:
+        # solve a max flow problem for each of the other reachable nodes
+        if t != s and reach[t-1] == 1:
             print "Solving Max Flow Problem from %d to %d" % (s,t)
-            # obtain the maximum flow
-            G = labeling_max_flow(G, s, t)
-            flow = G.f
+            # obtain the maximum flow (G keeps its checks for the next ones)
+            H = labeling_max_flow(G, s, t)
+            flow = H.f
             # if no error occurs
             if size(flow) != 0:
                 # get the flow value
-                flow_out = G.total_flow_from(s)
+                flow_out = H.total_flow_from(s)
                 # if it is smaller, update
                 if flow_out < min_cut_cap:
                     min_cut_cap = flow_out
@@ -179,15 +184,8 @@ def global_min_cut(*args):
     G.add_flow(min_flow)
     # get the residual graph
     R = G.residual_graph()
-    # find the set of reachable nodes in R
-    order, p = breath_first(R, s)   # do a search from s to all nodes
-    cut = empty(0, int)
-    
-    # add connected nodes to the cut
-    for node in range(n):
-        # add the node if it is connected
-        if p[node] != inf:
-            cut = append(cut, node + 1)
+    # the cut has the nodes reachable from s in R
+    cut = flatnonzero(R.reach_from(s)) + 1
     
     return cut
 
@@ -24,6 +24,7 @@ SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 # general modules
 from numpy import *                  # matrix manipulation
 from time import *                   # timers
+from heapq import heappush, heappop  # priority queues
 # personal modules and classes
 from GraphClass import *             # graph class
 
@@ -34,247 +35,412 @@ def breath_first(*args):
     """
     breath first search of nodes from k (k-reachable nodes)
     
+    @note: the out-arcs of each node are used in order of their heads,
+           without copying or sorting the graph
+    
     @type G: graph
     @param G: graph
     
-    @note: optional parameter
+    @note: optional parameters
     @type k: int
     @param k: source node
     
+    @type arcs: boolean
+    @param arcs: true to get the predecessor arcs too
+    
     @rtype order: int vector
     @return order: bfs order of each node
     
     @rtype p: tree
     @return p: predecessor tree
+    
+    @rtype p_arc: int vector
+    @return p_arc: position of the arc from the predecessor of each node
+                   (-1 if it has none), only if arcs is true
     """
     # get arguments
     G = args[0]
-    G = G.copy()
     
     # if a second argument exists set as source
     if len(args) > 1:
         k = args[1]
     else:
         k = G.source
+    # if a third argument exists, return the predecessor arcs
+    if len(args) > 2:
+        with_arcs = args[2]
+    else:
+        with_arcs = False
         
     # check if it a valid Graph
     if not G.is_correct_type('dr') or k == []:
         print 'ERROR: the graph is not directed or has no source set'
+        if with_arcs:
+            return [[], [], []]
         return [[], []]
     
-    # correct the position of the arcs to have them in ascending order
-    G = sort_arcs(G, "ascending")
+    # out-arcs of each node in ascending order of their heads
+    offsets, out_arcs = G.build_out_star()
+    heads = G.A[:,1]
+    u = G.u
     
     # get graph parameters
     n = G.nodes()
-    m = G.arcs()
     
     # initialize predecessor list
-    p = inf * ones(n, int)      # all set as infinity...
+    p = inf * ones(n)      # all set as infinity...
     p[k-1] = 0                  # ...except k which is set as source
+    p_arc = -1 * ones(n, int)   # arc from the predecessor
     
     # ordering variables
-    order = inf * ones(n, int)  # gives the order of each node
+    order = inf * ones(n)  # gives the order of each node
     order[k-1] = 0
-    position = 1                # variable for assigning order
     
-    # list of nodes
-    list = [k]                  # 1 -> node will be tested
+    # queue of nodes, each node enters it once: the nodes in
+    # queue[first:last] will be tested, and their order is their place
+    queue = zeros(n, int)
+    queue[0] = k
+    first = 0
+    last = 1
         
-    # keep on searching while there are nodes in the list
-    while size(list) != 0:
-        i = list[0]             # get the first node in the list
-        list = delete(list, 0)  # eliminate it from the list
+    # keep on searching while there are nodes in the queue
+    while first < last:
+        i = queue[first]        # get the first node in the queue
+        first = first + 1
         
-        # add all arcs from i to the list
-        pos = G.N[i-1,0]        # initial position of data for node i
-        # allow for iterations only if node information exists
-        if pos == -1:
-            link = 0
-        else:
-            link = 1
-        while link != 0:
-            # add the nodes that have not been used
-            j = G.A[pos,1]      # head of the arc
-            
-            # check if the arc is admissible and has capacity
-            if p[j-1] == inf and cap_ok(G.u, pos):
-                list = append(list, j)  # add j to the list
-                p[j-1] = i      # predecessor
-                order[j-1] = position   # position of the node
-                position = position + 1
-            pos = G.A[pos,2]    # check next node
-            link = pos
-            
+        # arcs from i to nodes that have not been used
+        arcs = out_arcs[offsets[i-1]:offsets[i]]
+        new = p[heads[arcs] - 1] == inf
+        # check if the arcs have capacity
+        if size(u) != 0:
+            new = new & (u[arcs] > 0)
+        arcs = arcs[new]
+        if size(arcs) == 0:
+            continue
+        
+        # use only the first of parallel arcs (heads are in order)
+        j = heads[arcs]
+        keep = ones(size(j), bool)
+        keep[1:] = j[1:] != j[:-1]
+        arcs = arcs[keep]
+        j = j[keep]
+        
+        # add the heads to the queue
+        count = size(j)
+        queue[last:last + count] = j
+        p[j-1] = i              # predecessor
+        p_arc[j-1] = arcs
+        order[j-1] = arange(last, last + count)     # position of the node
+        last = last + count
+    
+    if with_arcs:
+        return order, p, p_arc
+    return order, p
+
+def breath_first_levels(*args):
+    """
+    breath first search of nodes from k (k-reachable nodes), one level at
+    a time: the out-arcs of all the nodes of a level are checked at once
+    
+    @note: it gives the same order and predecessors as breath_first(),
+           with a few vector operations for each level instead of some
+           for each node
+    
+    @type G: graph
+    @param G: graph
+    
+    @note: optional parameters
+    @type k: int or int vector
+    @param k: source node(s), ordered first in the given order
+    
+    @type arcs: boolean
+    @param arcs: true to get the predecessor arcs too
+    
+    @rtype order: int vector
+    @return order: bfs order of each node
+    
+    @rtype p: tree
+    @return p: predecessor tree
+    
+    @rtype p_arc: int vector
+    @return p_arc: position of the arc from the predecessor of each node
+                   (-1 if it has none), only if arcs is true
+    """
+    # get arguments
+    G = args[0]
+    
+    # if a second argument exists set as source(s)
+    if len(args) > 1:
+        k = args[1]
+    else:
+        k = G.source
+    # if a third argument exists, return the predecessor arcs
+    if len(args) > 2:
+        with_arcs = args[2]
+    else:
+        with_arcs = False
+        
+    # check if it a valid Graph
+    if not G.is_correct_type('dr') or size(k) == 0:
+        print 'ERROR: the graph is not directed or has no source set'
+        if with_arcs:
+            return [[], [], []]
+        return [[], []]
+    
+    # out-arcs of each node in ascending order of their heads
+    offsets, out_arcs = G.build_out_star()
+    heads = G.A[:,1]
+    u = G.u
+    
+    # get graph parameters
+    n = G.nodes()
+    
+    # sources in their order, without repetitions
+    k = array(k, int).ravel()
+    dummy, first = unique(k, return_index=True)
+    level = k[sort(first)]      # nodes of the current level
+    
+    # initialize predecessor list
+    p = inf * ones(n)           # all set as infinity...
+    p[level-1] = 0              # ...except the sources
+    p_arc = -1 * ones(n, int)   # arc from the predecessor
+    
+    # ordering variables
+    order = inf * ones(n)       # gives the order of each node
+    order[level-1] = arange(size(level))
+    position = size(level)      # variable for assigning order
+    
+    # keep on searching while the level has nodes
+    while size(level) != 0:
+        # out-arcs of the nodes of the level, node after node
+        starts = offsets[level - 1]
+        counts = offsets[level] - starts
+        ends = cumsum(counts)
+        if size(ends) == 0 or ends[-1] == 0:
+            break
+        index = arange(ends[-1]) + repeat(starts - ends + counts, counts)
+        arcs = out_arcs[index]
+        tails = repeat(level, counts)
+        
+        # arcs to nodes that have not been used, with capacity
+        new = p[heads[arcs] - 1] == inf
+        if size(u) != 0:
+            new = new & (u[arcs] > 0)
+        arcs = arcs[new]
+        tails = tails[new]
+        
+        # each node is reached by the first arc to it
+        dummy, first = unique(heads[arcs], return_index=True)
+        first = sort(first)
+        arcs = arcs[first]
+        level = heads[arcs]
+        
+        p[level-1] = tails[first]   # predecessor
+        p_arc[level-1] = arcs
+        order[level-1] = arange(position, position + size(level))
+        position = position + size(level)
+    
+    if with_arcs:
+        return order, p, p_arc
     return order, p
 
 def depth_first(*args):
     """
     depth first search of nodes from k (k-reachable nodes)
     
+    @note: each node keeps a cursor to its next out-arc (out-arcs are used
+           in order of their heads), so every arc is checked once and the
+           graph is not copied or changed
+    
     @type G: graph
     @param G: graph
     
-    @note: optional parameter
+    @note: optional parameters
     @type k: int
     @param k: source node
     
+    @type times: boolean
+    @param times: true to get the discovery and finish times too
+    
     @rtype order: int vector
-    @return order: bfs order of each node
+    @return order: dfs order of each node
     
     @rtype p: tree
     @return p: predecessor tree
+    
+    @rtype discovery: int vector
+    @return discovery: time when each node is reached (only if times is
+                       true, inf if it is not reached)
+    
+    @rtype finish: int vector
+    @return finish: time when all the arcs of each node were checked
+                    (only if times is true, inf if it is not reached)
     """
     # get arguments
     G = args[0]                     # graph
-    G = G.copy()
     # if a second argument exists set as source
     if len(args) > 1:
         k = args[1]
     else:
         k = G.source
+    # if a third argument exists, return the times
+    if len(args) > 2:
+        times = args[2]
+    else:
+        times = False
         
     # check if it a valid Graph
     if not G.is_correct_type('dr') or k == []:
         print 'ERROR: the graph is not directed or has no source set'
+        if times:
+            return [[], [], [], []]
         return [[], []]
     
-    # correct the position of the arcs to have them in ascending order
-    G = sort_arcs(G, "ascending")
-    
-    A = G.A.copy()              # duplicate A for doing the search
-    N = G.N.copy()              # duplicate N for doing the search
-    u = G.u.copy()              # duplicate u for doing the search
+    # out-arcs of each node in ascending order of their heads, with
+    # their heads and capacity check as lists for stepping one by one
+    offsets, out_arcs = G.build_out_star()
+    heads = G.A[out_arcs,1].tolist()
+    if size(G.u) != 0:
+        open_arc = (G.u[out_arcs] > 0).tolist()
+    else:
+        open_arc = None
+    cursor = offsets[:-1].tolist()  # next arc to check of each node
+    end = offsets[1:].tolist()      # end of the arcs of each node
     
     # get graph parameters
     n = G.nodes()
-    m = G.arcs()
     
     # initialize predecessor list
-    p = inf * ones(n)           # all set as infinity...
+    p = [inf] * n               # all set as infinity...
     p[k-1] = 0                  # ...except k which is set as source
     
     # ordering variables
-    order = inf * ones(n, int)  # gives the order of each node
+    order = [inf] * n           # gives the order of each node
     order[k-1] = 0
     position = 1                # variable for assigning order
-    
-    # list of nodes
-    list = [k]                  # 1 -> node will be tested
-    # keep on searching while there are nodes in the list
-    while size(list) != 0:
-        last_pos = size(list) - 1
-        i = int(list[last_pos]) # get the first node in the list
-        pos = N[i-1,0]          # first data point for node i
-        if pos < 0:             # if no arcs are left
-            list = delete(list, last_pos)   # eliminate the node from the list
+    discovery = [inf] * n       # time when each node is reached
+    finish = [inf] * n          # time when each node is left
+    discovery[k-1] = 0
+    clock = 1                   # clock for discovery and finish times
+    
+    # stack of nodes
+    stack = [k]
+    # keep on searching while there are nodes in the stack
+    while stack != []:
+        i = stack[-1]           # get the last node in the stack
+        pos = cursor[i-1]       # next arc of node i
+        if pos == end[i-1]:     # if no arcs are left
+            stack.pop()         # eliminate the node from the stack
+            finish[i-1] = clock
+            clock = clock + 1
         else:
-            # add the nodes that have not been used
-            j = A[pos,1]        # head of the arc
+            cursor[i-1] = pos + 1   # the arc is used
+            
+            # add the node if it has not been used
+            j = heads[pos]      # head of the arc
             
             # check if the arc is admissible and has capacity
-            if p[j-1] == inf and cap_ok(u, pos):
-                list = append(list, j)  # add j to the list
+            if p[j-1] == inf and (open_arc is None or open_arc[pos]):
+                stack.append(j) # add j to the stack
                 p[j-1] = i      # predecessor
                 order[j-1] = position   # position of the node
                 position = position + 1
-            
-            # eliminate the arc from the list
-            A = delete(A, s_[pos], axis=0)
-            if size(u) != 0:
-                u = delete(u, pos)
-            # correct the N matrix
-            if N[i-1,0] == N[i-1,1]:
-                N[i-1,0], N[i-1,1] = -1, -1
-            else:
-                N[i-1,1] = N[i-1,1] -1
-            # reduce N for all other nodes j < i
-            for k in range(i, n):
-                N[k,0] = N[k,0] - 1
-                N[k,1] = N[k,1] - 1
+                discovery[j-1] = clock
+                clock = clock + 1
     
-    return order, p
+    if times:
+        return array(order, float), array(p, float), \
+               array(discovery, float), array(finish, float)
+    return array(order, float), array(p, float)
 
 def topological(*args):
     """
     topological search of nodes - looks for a root
     
+    @note: the nodes with in-degree 0 are kept in a heap, so the smallest
+           one is used first in O(log n)
+    
     @type G: graph
     @param G: graph
     
+    @note: optional parameters
+    @type cycle: boolean
+    @param cycle: true to get a directed cycle too, when there is one
+    
     @rtype order: int vector
     @return order: bfs order of each node
     
     @rtype p: tree
     @return p: predecessor tree
+    
+    @rtype cycle: int list
+    @return cycle: nodes of a directed cycle, with the first node repeated
+                   at the end (empty if there is none), only if cycle is true
     """
     # get arguments
     G = args[0]                     # graph
-    G = G.copy()
+    # if a second argument exists, return a cycle
+    if len(args) > 1:
+        with_cycle = args[1]
+    else:
+        with_cycle = False
     
     # check if it a valid Graph
     if not G.is_correct_type('d'):
         print 'ERROR: the graph is not directed'
+        if with_cycle:
+            return [[], [], []]
         return [[], []]
     
     # get graph parameters
     n = G.nodes()
-    m = G.arcs()
+    
+    # out-arcs of each node, with their heads as a list
+    offsets, out_arcs = G.build_out_star()
+    heads = G.A[out_arcs,1].tolist()
+    offsets = offsets.tolist()
     
     # initialize predecessor list
     p = inf * ones(n)           # all set as infinity...
-    t_p = zeros(n, int)
+    t_p = [0] * n               # temporal predecessor
     
     # initialize variables
-    indegree = zeros(n)         # in-degree of each node
+    indegree = G.degrees()[1].tolist()      # in-degree of each node
     order = zeros(n)            # topological order of each node
+    done = zeros(n, bool)       # true for the nodes already ordered
     
-    # set the in-degree of each node
-    for arc in range(m):
-        j = G.A[arc,1]          # head of the arc
-        indegree[j-1] = indegree[j-1] + 1
-    
-    # set the list of nodes with in-degree 0
-    list = zeros(n)             # 0=does not belong to list, 1=does
-    for node in range(n):
-        # if it has in-degree 0, add it to list
-        if indegree[node] == 0:
-            list[node] = 1
+    # set the heap of nodes with in-degree 0 (sorted, so it is a heap)
+    heap = [node + 1 for node in range(n) if indegree[node] == 0]
         
-    # iterate till the list is empty
+    # iterate till the heap is empty
     position = 0                # variable for assigning topological order
-    while max(list) == 1:
-        i = argmax(list) + 1    # get the smallest node in the list
-        list[i-1] = 0           # eliminate it from the list
+    while heap != []:
+        i = heappop(heap)       # get the smallest node in the heap
         order[i-1] = position   # assign order
+        done[i-1] = True
         # set predecessor
         p[i-1] = t_p[i-1]
         position = position + 1
         
         # go through adjacency list of node i and reduce it's in-degree
-        pos = G.N[i-1,0]        # starting point of data for node i
-        # allow for iterations only if node information exists
-        if pos == -1:
-            link = 0
-        else:
-            link = 1            # initialization of link variable
-        while link != 0:
-            j = G.A[pos,1]      # head of the arc
+        for pos in xrange(offsets[i-1], offsets[i]):
+            j = heads[pos]      # head of the arc
             t_p[j-1] = i        # temporal predecessor
             indegree[j-1] = indegree[j-1] - 1   # reduce the in-degree of the arc
-            # check if it is 0 to add it to the list
+            # check if it is 0 to add it to the heap
             if indegree[j-1] == 0:
-                list[j-1] = 1
-            # get next arc position
-            link = int(G.A[pos,2])
-            pos = link
+                heappush(heap, j)
     
     # if not all nodes were ordered, a cycle exists
-    if max(order) < n - 1:
+    if position < n:
         print 'CYCLE: The graph has a directed cycle, no topological order exists'
+        if with_cycle:
+            return [[], [], find_cycle(G, done)]
         return [[], []]
-    else:
-        return order, p
+    
+    if with_cycle:
+        return order, p, []
+    return order, p
 
 """
 Auxiliary Functions
@@ -300,11 +466,46 @@ def cap_ok(u, pos):
     else:
         return False
 
+def find_cycle(G, done):
+    """
+    find a directed cycle among the nodes that could not be ordered by a
+    topological search, walking back through in-arcs from nodes not done
+    (each of them has one, or it would have been ordered)
+    
+    @type G: graph
+    @param G: graph
+    
+    @type done: boolean vector
+    @param done: true for the nodes that were ordered
+    
+    @rtype: int list
+    @return: nodes of the cycle, with the first node repeated at the end
+    """
+    step = {}                   # place of each node in the walk
+    walk = []                   # nodes walked through
+    i = int(argmin(done)) + 1   # first node not done
+    
+    # walk back until a node is repeated
+    while i not in step:
+        step[i] = len(walk)
+        walk.append(i)
+        tails = G.A[G.get_in_arcs_pos(i),0]
+        i = int(tails[~done[tails - 1]][0])     # a tail not done
+    
+    # the cycle was walked backwards
+    cycle = walk[step[i]:]
+    cycle.reverse()
+    
+    return cycle + [cycle[0]]
+
 def sort_arcs(*args):
     """ 
     sorts the adjacency matrix to make sure that it is in
     ascending/descending order (also sorts c, u and f)
     
+    @note: the graph keeps track of its order, so sorting a graph that
+           is already in ascending order takes no time
+    
     @type G: graph
     @param G: graph
     
@@ -324,82 +525,8 @@ def sort_arcs(*args):
     else:
         type = "ascending"
     
-    # get graph parameters
-    n = G.nodes()
-    m = G.arcs()
-    
-    # initialize matrices
-    N = -1 * ones((n,2), int)
-        
-    # stick c, u and f to A for sorting
-    M = array(G.A.copy()).T
-    if size(G.c) != 0:
-        M = vstack([M, G.c])
-    if size(G.u) != 0:
-        M = vstack([M, G.u])
-    if size(G.f) != 0:
-        M = vstack([M, G.f])
-    if size(G.mirror) != 0:
-        M = vstack([M, G.mirror])           # link for residual graphs
-        M = vstack([M, array(range(m))])    # index to correct the order
-    M = M.T
-    
-    # trick to sort by first col and then second col
-    Ms = 10 * M[:,0] + M[:,1]
-    # sort the matrix
-    sort_order = Ms.argsort()
-    if type == "ascending":
-        M = M[sort_order]
-    else:
-        M = M[sort_order[range(size(sort_order) - 1, -1, -1)]]
-    
-    # get the arc data back
-    c, u, f, mirror = empty(0), empty(0), empty(0), empty((0,2), float)
-    if size(G.c) != 0:
-        c = M[:,3]
-        M = delete(M, s_[3], axis=1)
-    if size(G.u) != 0:
-        u = M[:,3]
-        M = delete(M, s_[3], axis=1)
-    if size(G.f) != 0:
-        f = M[:,3]
-        M = delete(M, s_[3], axis=1)
-    if size(G.mirror) != 0:
-        mirror = M[:,3]
-        M = delete(M, s_[3], axis=1)
-        # get the mixed indices
-        s_mirr = M[:,3]
-        M = delete(M, s_[3], axis=1)
-        # order them and apply it to mirror
-        index_order = s_mirr.argsort()
-        mirror = index_order[array(mirror, int)]
-    
-    # correct the link of A and build N
-    for arc in range(m):
-        i = M[arc,0]            # head of the arc
-        
-        # if it is the first arc, set N[i-1,0]
-        if N[i-1,0] == -1:
-            N[i-1,0] = arc      # initial data point
-        N[i-1,1] = arc          # update last data point
-        # correct the link
-        if arc < m - 1:
-            # check if next arc is also from i
-            if M[arc+1,0] == i:
-                M[arc,2] = arc + 1
-            else:
-                M[arc,2] = 0
-        else:
-            # the last line has only a 0
-            M[arc,2] = 0
-    
-    # correct the variables
-    G.A = M
-    G.N = N
-    G.c = c
-    G.u = u
-    G.f = f
-    G.mirror = mirror
+    # sort by tail and head, keeping the order of parallel arcs
+    G = G.sort_arcs(type)
     
     return G
 
@@ -421,14 +548,15 @@ def sort_nodes(G, order):
     m = G.arcs()
         
     # correct arc names according to their new order
-    for arc in range(m):
-        # correct the node names of each arc
-        G.A[arc,0] = order[G.A[arc,0] - 1] + 1
-        G.A[arc,1] = order[G.A[arc,1] - 1] + 1
+    order = array(order, int).ravel()
+    A = array(G.A, int)
+    A[:,0] = order[A[:,0] - 1] + 1
+    A[:,1] = order[A[:,1] - 1] + 1
+    G.A = A
         
     # correct external flow positions
     B = array(G.B).copy()
-    B = B[array(order).argsort(),:]
+    B = B[order.argsort()]
     
     # correct coordinates
     coord = empty((0,2), float)
@@ -504,12 +632,14 @@ def board_depth_first(board):
 def board_topological(board):
     print "\nTopological Search Algorithm"
     ini_time = clock()
-    order, p = topological(board.graph)
+    order, p, cycle = topological(board.graph, True)
     end_time = clock()
     
     print "\nResults:"
     print "order of nodes: ", order
     print "Topological Tree: ", p
+    if cycle != []:
+        print "cycle: ", ' -> '.join([str(node) for node in cycle])
     print "time taken: ", end_time - ini_time
     
     board.draw_graph()
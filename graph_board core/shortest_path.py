@@ -146,7 +146,7 @@ def shortest_path_dijkstra(*args):
         return [[], 0]
     
     # check if all costs are positive
-    if min(G.c[:]) < 0:
+    if G.has_negative_cost():
         print("ERROR: for using Dijkstra's Algorithm all weights must be positive")
         return [[], 0]
     
@@ -66,7 +66,7 @@ def kruskal(*args):
     # get graph parameters
     n = G.nodes()
     # check if all nodes are reachable from k
-    if sum(G.u_reach_from(k)) < n:
+    if not G.is_connected():
         print 'ERROR: the graph is not connected: not all nodes are reachable'
         return []
     
@@ -177,7 +177,7 @@ def prim(*args):
     n = G.nodes()
     
     # check if all nodes are reachable from k
-    if sum(G.u_reach_from(k)) < n:
+    if not G.is_connected():
         print 'ERROR: the graph is not connected: not all nodes are reachable'
         return []
     
@@ -187,6 +187,10 @@ def prim(*args):
     
     # set of nodes
     S = array([k])                  # nodes already set
+    rank = zeros(n, int)            # place of each node in S
+    
+    # arcs in the cut, updated as nodes are added to S
+    cut, in_S = G.get_cut_mask(S)
     
     # create a file to store the steps
     draw_graph(G, ["style", "write", "prim.ps"], ["tree", p])
@@ -195,30 +199,38 @@ def prim(*args):
     while size(S) < n:
         print "nodes in set: ", S
         
-        # get arcs in the cut
-        arc_list = array(G.get_cut_arcs_pos(S), int)
+        # look for the arcs in the cut with the minimum cost
+        arc_list = flatnonzero(cut)
+        cost = G.c[arc_list]
+        arc_list = arc_list[cost == cost.min()]
         
-        # look for the one with the minimum cost
-        cost = inf
-        for arc in arc_list:
-            # if the cost is smaller, update
-            if G.c[arc] < cost:
-                min_arc = arc
-                cost = G.c[arc]
+        # on ties, take the first as listed by get_cut_arcs_pos()
+        tails = array(G.A[arc_list,0], int)
+        heads = array(G.A[arc_list,1], int)
+        outward = in_S[tails - 1]
+        ends = where(outward, tails, heads)
+        min_arc = arc_list[lexsort((arc_list, ~outward, rank[ends - 1]))[0]]
         
         # get arc data
         i = int(G.A[min_arc,0])
         j = int(G.A[min_arc,1])
         
         # if it is forward add j to S and update
-        if sum(S == i) > 0:
+        if in_S[i-1]:
             S = append(S,j)
             p[j-1] = i
         # if it is backwards, swap the arc and add it
         else:
             G.swap_arc(min_arc)
+            # the arc is moved to the end of A
+            cut = append(delete(cut, min_arc), False)
             S = append(S,i)
             p[i-1] = j
+        
+        # update the cut with the new node
+        k = S[-1]
+        rank[k-1] = size(S) - 1
+        G.add_to_cut(cut, in_S, k)
           
         # add a step to the output file
         draw_graph(G, ["style", "append", "prim.ps"], ["tree", p])
@@ -0,0 +1,515 @@
+"""
+Tests for the Graph Class
+
+@copyright: Copyright (c) 2009, Rodrigo Carrasco <rodrigo.carrasco at gmail.com>
+@author: mr_rax
+"""
+# general modules
+import unittest                     # test cases
+import os                           # graph files
+import shutil                       # temporary directories
+import tempfile                     # temporary directories
+from numpy import *                 # matrix manipulation
+# personal modules and classes
+from GraphClass import *            # graph class
+from search_order import *          # searching algorithms
+from max_flow import *              # max flow algorithms
+
+def small_graph():
+    """
+    directed graph 1->2->3->1, 2->4 with costs, capacities and flows
+    """
+    G = Graph()
+    G.type = 'd'
+    G.add_nodes(4)
+    G.add_arcs([1, 2, 3, 2], [2, 3, 1, 4], [1., 2., 3., 4.], [5., 6., 7., 8.],
+               [0., 0., 0., 0.])
+    return G
+
+def random_arcs(n, m, seed):
+    """
+    tails and heads of m random arcs between n nodes (with loops and
+    parallel arcs)
+    """
+    rs = RandomState(seed)
+    return rs.randint(1, n + 1, m), rs.randint(1, n + 1, m)
+
+class GraphTestCase(unittest.TestCase):
+    """
+    checks of the arcs of a graph
+    """
+    def assertStars(self, G):
+        """
+        the out-arcs and in-arcs of each node are the arcs of A with that
+        tail or head, in ascending position
+        """
+        A = array(G.A)
+        for i in range(1, G.nodes() + 1):
+            self.assertEqual(list(G.get_out_arcs_pos(i)),
+                             list(flatnonzero(A[:,0] == i)))
+            self.assertEqual(list(G.get_in_arcs_pos(i)),
+                             list(flatnonzero(A[:,1] == i)))
+    
+    def assertArcs(self, G, arcs):
+        """
+        the arcs of G are the (tail, head, cost) rows of arcs, in order
+        """
+        self.assertEqual(G.arcs(), len(arcs))
+        if arcs != []:
+            self.assertEqual(G.A[:,:2].tolist(), [list(a[:2]) for a in arcs])
+            self.assertEqual(G.c.tolist(), [a[2] for a in arcs])
+        self.assertStars(G)
+    
+    def assertSameGraph(self, G, H, names=['c', 'u', 'f', 'B']):
+        """
+        G and H have the same nodes, arcs and data
+        """
+        self.assertEqual(G.nodes(), H.nodes())
+        self.assertEqual(G.A[:,:2].tolist(), H.A[:,:2].tolist())
+        for name in names:
+            self.assertTrue(allclose(getattr(G, name), getattr(H, name)))
+        self.assertStars(H)
+
+class TestView(unittest.TestCase):
+    """
+    a view does not see the changes made to its graph
+    """
+    def test_del_arc(self):
+        G = small_graph()
+        V = G.view()
+        A = array(V.A)
+        G.del_arc_pos(1)
+        self.assertTrue((V.A == A).all())
+        self.assertEqual(V.arcs(), 4)
+        order, p = breath_first(V, 1)
+        self.assertTrue((order != inf).all())
+    
+    def test_add_arc(self):
+        G = small_graph()
+        V = G.view()
+        N = array(V.N)
+        A = array(V.A)
+        G.add_arc(1, 4)
+        self.assertTrue((V.N == N).all())
+        self.assertTrue((V.A == A).all())
+        self.assertEqual(V.arcs(), 4)
+    
+    def test_data(self):
+        G = small_graph()
+        V = G.view()
+        G.add_data_to_arc_pos(0, 10., 20., 30.)
+        self.assertEqual(V.c[0], 1.)
+        self.assertEqual(V.u[0], 5.)
+        self.assertEqual(V.f[0], 0.)
+        self.assertEqual(G.c[0], 10.)
+    
+    def test_shared_arrays(self):
+        G = small_graph()
+        V = G.view()
+        # shared arrays cannot be changed in place, in the graph or the view
+        self.assertRaises(ValueError, G.u.__setitem__, 0, 0.)
+        self.assertRaises(ValueError, V.u.__setitem__, 0, 0.)
+        G.get_writable('u')[0] = 0.
+        self.assertEqual(G.u[0], 0.)
+        self.assertEqual(V.u[0], 5.)
+        V.get_writable('u')[1] = 1.
+        self.assertEqual(G.u[1], 6.)
+    
+    def test_augment_path(self):
+        G = small_graph()
+        R = G.residual_graph()
+        V = R.view()
+        u = array(V.u)
+        path = array([1, 2, 4])
+        R = augment_path(R, path, path_max_capacity(R, path))
+        self.assertTrue((V.u == u).all())
+        self.assertFalse((R.u == u).all())
+
+class TestDelete(GraphTestCase):
+    """
+    deleted arcs are unlinked at once and compacted later, without
+    changing the positions seen from outside
+    """
+    def setUp(self):
+        I, J = random_arcs(8, 60, 1)
+        self.G = Graph()
+        self.G.type = 'd'
+        self.G.add_nodes(8)
+        self.G.add_arcs(I, J, c=arange(60) * 1.0)
+        self.arcs = zip(I.tolist(), J.tolist(), range(60))
+    
+    def delete_pos(self, pos):
+        self.G.del_arc_pos(pos)
+        del self.arcs[pos]
+    
+    def delete_arc(self, i, j):
+        self.G.del_arc(i, j)
+        for k in range(len(self.arcs)):
+            if self.arcs[k][:2] == (i, j):
+                del self.arcs[k]
+                break
+    
+    def test_positions(self):
+        G = self.G
+        G.compact_ratio = 0.9           # keep the deleted arcs
+        rs = RandomState(2)
+        for step in range(30):
+            if step % 2:
+                self.delete_pos(rs.randint(len(self.arcs)))
+            else:
+                self.delete_arc(*self.arcs[rs.randint(len(self.arcs))][:2])
+            # positions skip the deleted arcs, without compacting
+            k = rs.randint(len(self.arcs))
+            i, j = self.arcs[k][:2]
+            first = [a[:2] for a in self.arcs].index((i, j))
+            self.assertEqual(G.get_arc_pos(i, j), first)
+            self.assertTrue(G.has_arc(i, j))
+            self.assertTrue(G._dead > 0)
+        self.assertArcs(G, self.arcs)
+        self.assertEqual(G._dead, 0)
+    
+    def test_compact(self):
+        G = self.G
+        G.compact_ratio = 0.1
+        for pos in [59, 0, 10, 10, 30, 20, 5, 7]:
+            self.delete_pos(pos)
+        self.assertTrue(G._dead < 0.1 * 60)
+        self.assertArcs(G, self.arcs)
+    
+    def test_add_after_delete(self):
+        G = self.G
+        G.compact_ratio = 0.9
+        self.delete_pos(3)
+        self.delete_arc(*self.arcs[10][:2])
+        G.add_arc(2, 5)
+        G.get_writable('c')[G.arcs() - 1] = 100.
+        self.arcs.append((2, 5, 100.))
+        self.delete_pos(0)
+        self.assertArcs(G, self.arcs)
+    
+    def test_del_arcs(self):
+        G = self.G
+        G.del_arcs([4, 1, 50])          # a few, unlinked
+        keep = [a for k, a in enumerate(self.arcs) if k not in (1, 4, 50)]
+        self.assertArcs(G, keep)
+        G.del_arcs(range(0, 57, 2))     # many, arrays rebuilt
+        self.assertArcs(G, keep[1::2])
+    
+    def test_del_node(self):
+        G = self.G
+        G.del_node(3)
+        rename = lambda i: i - (i > 3)
+        keep = [(rename(i), rename(j), c) for (i, j, c) in self.arcs
+                if 3 not in (i, j)]
+        self.assertEqual(G.nodes(), 7)
+        self.assertArcs(G, keep)
+    
+    def test_arc_index(self):
+        G = self.G
+        G.set_arc_index(True)
+        G.compact_ratio = 0.9
+        rs = RandomState(3)
+        for step in range(20):
+            self.delete_pos(rs.randint(len(self.arcs)))
+            pairs = [a[:2] for a in self.arcs]
+            for i, j in [(1, 2), (2, 2), (5, 8), pairs[0], pairs[-1]]:
+                if (i, j) in pairs:
+                    self.assertEqual(G.get_arc_pos(i, j), pairs.index((i, j)))
+                else:
+                    self.assertFalse(G.has_arc(i, j))
+        self.assertArcs(G, self.arcs)
+
+class TestAddArcs(GraphTestCase):
+    """
+    arcs added at once, with their data
+    """
+    def test_data(self):
+        G = small_graph()
+        G.add_arcs([4, 1], [1, 4], c=[9., 8.])
+        self.assertArcs(G, [(1, 2, 1.), (2, 3, 2.), (3, 1, 3.), (2, 4, 4.),
+                            (4, 1, 9.), (1, 4, 8.)])
+        self.assertEqual(G.u.tolist(), [5., 6., 7., 8., 0., 0.])
+    
+    def test_wrong_data(self):
+        G = small_graph()
+        G.add_arcs([4, 1], [1, 4], c=[9.])
+        G.add_arcs([4, 1], [1, 4], u=[9., 8., 7.])
+        self.assertEqual(G.arcs(), 4)
+        self.assertEqual((size(G.c), size(G.u), size(G.f)), (4, 4, 4))
+
+class TestArcsPos(unittest.TestCase):
+    """
+    positions of many arcs at once
+    """
+    def check(self, G):
+        I, J = random_arcs(6, 50, 5)
+        I = append(I, [0, 7, 1])
+        J = append(J, [1, 1, 0])
+        pos = G.get_arcs_pos(I, J)
+        pairs = G.A[:,:2].tolist()
+        for k in range(size(I)):
+            if [I[k], J[k]] in pairs:
+                self.assertEqual(pos[k], pairs.index([I[k], J[k]]))
+            else:
+                self.assertEqual(pos[k], -1)
+    
+    def test_search(self):
+        G = Graph()
+        G.type = 'd'
+        G.add_nodes(6)
+        G.add_arcs(*random_arcs(6, 40, 4))
+        self.check(G)
+        G.sort_arcs()
+        self.check(G)
+    
+    def test_index(self):
+        G = Graph()
+        G.type = 'd'
+        G.add_nodes(6)
+        G.add_arcs(*random_arcs(6, 40, 4))
+        G.set_arc_index(True)
+        self.check(G)
+
+class TestGenerators(GraphTestCase):
+    """
+    generated graphs have consistent arc lists
+    """
+    def test_random_graph(self):
+        G = Graph()
+        G.random_graph([30, 80], ['directed'], seed=1)
+        self.assertEqual((G.nodes(), G.arcs()), (30, 80))
+        self.assertFalse(any(G.A[:,0] == G.A[:,1]))
+        self.assertStars(G)
+        H = Graph()
+        H.random_graph([30, 80], ['directed'], seed=1)
+        self.assertEqual(G.A.tolist(), H.A.tolist())
+    
+    def test_grid_graph(self):
+        G = Graph()
+        G.grid_graph([4, 5], ['directed'])
+        self.assertEqual((G.nodes(), G.arcs()), (20, 4 * 4 + 3 * 5))
+        self.assertEqual(shape(G.coord), (20, 2))
+        self.assertStars(G)
+    
+    def test_geometric_graph(self):
+        G = Graph()
+        G.geometric_graph(40, 0.3, ['directed'], seed=2)
+        self.assertEqual(G.nodes(), 40)
+        # the ends of each arc are close
+        d = G.coord[G.A[:,0] - 1] - G.coord[G.A[:,1] - 1]
+        self.assertTrue((sqrt((d ** 2).sum(1)) <= 0.3 + 1e-9).all())
+        self.assertStars(G)
+    
+    def test_layered_graph(self):
+        G = Graph()
+        G.layered_graph([4, 5], 0.5, seed=3)
+        self.assertEqual(G.nodes(), 20)
+        self.assertTrue(all((G.A[:,1] - 1) // 5 == (G.A[:,0] - 1) // 5 + 1))
+        self.assertStars(G)
+    
+    def test_power_law_graph(self):
+        G = Graph()
+        G.power_law_graph([50, 120], 2.5, ['directed'], seed=4)
+        self.assertEqual(G.nodes(), 50)
+        self.assertFalse(any(G.A[:,0] == G.A[:,1]))
+        self.assertStars(G)
+
+class TestFiles(GraphTestCase):
+    """
+    graphs saved in each format are read back the same
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.G = small_graph()
+        self.G.add_external_flow(array([2., 0., 0., -2.]))
+    
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    
+    def round_trip(self, name):
+        file_name = os.path.join(self.dir, name)
+        self.G.save_graph_to_file(file_name)
+        return Graph().form_graph_from_file(file_name)
+    
+    def test_text(self):
+        self.assertSameGraph(self.G, self.round_trip('graph.txt'))
+    
+    def test_gzip(self):
+        self.assertSameGraph(self.G, self.round_trip('graph.txt.gz'))
+    
+    def test_npz(self):
+        self.assertSameGraph(self.G, self.round_trip('graph.npz'))
+    
+    def test_dir(self):
+        H = self.round_trip('graph')
+        self.assertSameGraph(self.G, H)
+        # the mapped arrays are copied before they change
+        H.del_arc_pos(0)
+        H.add_arc(4, 1)
+        self.assertSameGraph(self.G, self.round_trip('graph'))
+    
+    def test_dimacs(self):
+        file_name = os.path.join(self.dir, 'graph.min')
+        self.G.save_graph_to_dimacs(file_name)
+        H = Graph().form_graph_from_dimacs(file_name)
+        self.assertSameGraph(self.G, H, ['c', 'u', 'B'])
+    
+    def test_dimacs_max_flow(self):
+        file_name = os.path.join(self.dir, 'graph.max')
+        self.G.strip_cost()
+        self.G.source = 1
+        self.G.sink = 4
+        self.G.save_graph_to_dimacs(file_name)
+        H = Graph().form_graph_from_dimacs(file_name)
+        self.assertSameGraph(self.G, H, ['u'])
+        self.assertEqual((H.source, H.sink), (1, 4))
+    
+    def test_edge_list(self):
+        file_name = os.path.join(self.dir, 'graph.edges')
+        self.G.save_graph_to_edge_list(file_name)
+        H = Graph().form_graph_from_edge_list(file_name)
+        self.assertSameGraph(self.G, H, ['c'])
+
+class TestReverseStar(unittest.TestCase):
+    """
+    the in-arcs follow the arcs when A or N are replaced
+    """
+    def test_replace_arcs(self):
+        G = small_graph()
+        self.assertEqual(list(G.get_in_arcs_pos(3)), [1])
+        # reverse every arc, keeping the number of arcs and nodes
+        A = array(G.A)
+        A[:,[0, 1]] = A[:,[1, 0]]
+        G.A = A
+        G.build_forward_star()
+        self.assertEqual(list(G.get_in_arcs_pos(3)), [2])
+        self.assertEqual(list(G.get_in_arcs_pos(2)), [1, 3])
+        self.assertEqual(list(G.get_in_arcs_pos(4)), [])
+
+class TestReach(unittest.TestCase):
+    """
+    nodes reachable from a node, with and without the direction of arcs
+    """
+    def test_reach(self):
+        G = small_graph()
+        G.add_nodes(1)
+        self.assertEqual(list(G.reach_from(4)), [0, 0, 0, 1, 0])
+        self.assertEqual(list(G.reach_from(3)), [1, 1, 1, 1, 0])
+        self.assertEqual(list(G.u_reach_from(4)), [1, 1, 1, 1, 0])
+        self.assertEqual(list(G.u_reach_from(5)), [0, 0, 0, 0, 1])
+
+class TestMaxFlow(unittest.TestCase):
+    """
+    augmenting paths use the arcs found by the search, even with a parallel
+    arc without residual capacity before them
+    """
+    def setUp(self):
+        self.G = Graph()
+        self.G.type = 'd'
+        self.G.add_nodes(3)
+        self.G.add_arcs([1, 1, 2], [2, 2, 3], [1., 1., 1.], [0., 4., 4.])
+    
+    def check(self, Gf):
+        self.assertEqual(list(Gf.f), [0., 4., 4.])
+    
+    def test_path_arcs(self):
+        R = self.G.residual_graph()
+        order, p, p_arc = breath_first_levels(R, 1, True)
+        path = get_rooted_path(p, 3)
+        arcs = get_rooted_path_arcs(p, p_arc, 3)
+        self.assertEqual(list(arcs), [1, 2])
+        self.assertEqual(path_max_capacity(R, path, arcs), 4.)
+        self.assertEqual(path_max_capacity(R, path), 0.)
+    
+    def test_generic_augmenting_path(self):
+        self.check(generic_augmenting_path(self.G.copy(), 1, 3))
+    
+    def test_labeling_max_flow(self):
+        self.check(labeling_max_flow(self.G.copy(), 1, 3))
+
+class TestMemo(unittest.TestCase):
+    """
+    the data derived from an array is forgotten when it changes
+    """
+    def test_capacity(self):
+        G = small_graph()
+        self.assertEqual(list(G.reach_from(1)), [1, 1, 1, 1])
+        G.get_writable('u')[0] = 0.
+        self.assertEqual(list(G.reach_from(1)), [1, 0, 0, 0])
+        G.u[0] = 5.
+        G.touch('u')
+        self.assertEqual(list(G.reach_from(1)), [1, 1, 1, 1])
+    
+    def test_cost(self):
+        G = small_graph()
+        self.assertFalse(G.has_negative_cost())
+        G.get_writable('c')[2] = -1.
+        self.assertTrue(G.has_negative_cost())
+    
+    def test_swap_arc(self):
+        G = small_graph()
+        self.assertFalse(G.has_negative_cost())
+        G.get_writable('c')[0] = -1.
+        G.swap_arc(0)
+        self.assertTrue(G.has_negative_cost())
+        self.assertEqual(list(G.reach_from(2)), [1, 1, 1, 1])
+        self.assertEqual(list(G.reach_from(1)), [1, 0, 0, 0])
+
+class TestTopological(unittest.TestCase):
+    """
+    topological search, giving a cycle when there is no order
+    """
+    def test_order(self):
+        G = small_graph()
+        G.del_arc(3, 1)
+        order, p, cycle = topological(G, True)
+        self.assertEqual(cycle, [])
+        for k in range(G.arcs()):
+            self.assertTrue(order[G.A[k,0]-1] < order[G.A[k,1]-1])
+    
+    def test_cycle(self):
+        G = small_graph()
+        G.add_nodes(2)
+        G.add_arcs([4, 5, 6], [5, 6, 4])
+        order, p, cycle = topological(G, True)
+        self.assertEqual(order, [])
+        self.assertEqual(cycle[0], cycle[-1])
+        self.assertEqual(len(set(cycle)), len(cycle) - 1)
+        for k in range(len(cycle) - 1):
+            self.assertTrue(G.has_arc(cycle[k], cycle[k+1]))
+        # without asking for it, the cycle is not given
+        self.assertEqual(len(topological(G)), 2)
+
+class TestCompact(unittest.TestCase):
+    """
+    the compact mode is kept when the graph is formed again
+    """
+    def check(self, G):
+        self.assertEqual(G.A.dtype, int32)
+        self.assertEqual(G.N.dtype, int32)
+        G.add_arc(1, 2)
+        self.assertEqual(G.A.dtype, int32)
+        self.assertEqual(G.in_link.dtype, int32)
+    
+    def test_random_graph(self):
+        G = Graph()
+        G.set_compact(True, float32)
+        G.random_graph([20, 40], ['directed'], seed=1)
+        self.check(G)
+    
+    def test_grid_graph(self):
+        G = Graph()
+        G.set_compact(True, float32)
+        G.grid_graph([4, 5], ['directed'])
+        self.check(G)
+        self.assertEqual(G.coord.dtype, float32)
+    
+    def test_form_graph(self):
+        H = small_graph()
+        G = Graph()
+        G.set_compact(True, float32)
+        G.form_graph(H.N, H.A, 'd')
+        self.check(G)
+
+if __name__ == '__main__':
+    unittest.main()